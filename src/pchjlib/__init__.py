@@ -43,7 +43,7 @@ result = is_prime(7)  # Check for prime numbers
 Dependencies
 ------------------------------------------------------------------------------------------------
 - Built-in: `math`, `re`, `random`, `functools`, `argparse`.
-- External: `gmpy2` (optional for big integer support).
+- External: `gmpy2` (optional for big integer support), `numpy` (optional for vectorized batch operations).
 
 Feedback and Support
 ------------------------------------------------------------------------------------------------
@@ -59,7 +59,20 @@ from pchjlib.pchjicon import main as pchj_icon
 from pchjlib.pchjmain import main as pchj_main
 
 # Explicit imports to avoid wildcard pollution
-from pchjlib.primes import is_prime, generate_prime_list, is_emirp, generate_emirp_list
+from pchjlib.primes import (
+    is_prime,
+    generate_prime_list,
+    iter_primes,
+    primes_in_range,
+    PrimeSieve,
+    build_prime_table,
+    open_prime_table,
+    prime_count,
+    nth_prime,
+    is_prime_many,
+    is_emirp,
+    generate_emirp_list,
+)
 from pchjlib.twin_abundant import (
     is_twin_prime,
     generate_twin_prime_list,
@@ -84,13 +97,36 @@ from pchjlib.special_numbers2 import (
 )
 from pchjlib.divisors_multiples import (
     sum_of_divisors,
+    build_sigma_table,
+    PrimePowerRule,
+    tau_rule,
+    sigma_k_rule,
+    phi_rule,
+    mu_rule,
+    omega_rule,
+    multiplicative_sieve,
+    iter_multiplicative_sieve,
     generate_divisor_list,
+    iter_divisors,
     generate_multiple_list,
     common_divisors,
     greatest_common_divisor,
     least_common_multiple,
 )
-from pchjlib.prime_factorization import prime_factors, greatest_common_prime_divisor
+from pchjlib.prime_factorization import (
+    CancellationToken,
+    PartialFactorization,
+    build_spf_table,
+    prime_factors,
+    prime_factors_many,
+    siqs_factor,
+    factorization,
+    factorization_cache_info,
+    set_factorization_cache_size,
+    clear_factorization_cache,
+    greatest_common_prime_divisor,
+    greatest_common_prime_divisor_many,
+)
 from pchjlib.string_processing import (
     remove_duplicates,
     extract_digits_from_string,
@@ -122,6 +158,14 @@ release_date = "August 12, 2025"
 __all__ = [
     "is_prime",
     "generate_prime_list",
+    "iter_primes",
+    "primes_in_range",
+    "PrimeSieve",
+    "build_prime_table",
+    "open_prime_table",
+    "prime_count",
+    "nth_prime",
+    "is_prime_many",
     "is_emirp",
     "generate_emirp_list",
     "is_twin_prime",
@@ -142,13 +186,33 @@ __all__ = [
     "is_strong_number",
     "are_friendly_numbers",
     "sum_of_divisors",
+    "build_sigma_table",
+    "PrimePowerRule",
+    "tau_rule",
+    "sigma_k_rule",
+    "phi_rule",
+    "mu_rule",
+    "omega_rule",
+    "multiplicative_sieve",
+    "iter_multiplicative_sieve",
     "generate_divisor_list",
+    "iter_divisors",
     "generate_multiple_list",
     "common_divisors",
     "greatest_common_divisor",
     "least_common_multiple",
+    "CancellationToken",
+    "PartialFactorization",
+    "build_spf_table",
     "prime_factors",
+    "prime_factors_many",
+    "siqs_factor",
+    "factorization",
+    "factorization_cache_info",
+    "set_factorization_cache_size",
+    "clear_factorization_cache",
     "greatest_common_prime_divisor",
+    "greatest_common_prime_divisor_many",
     "remove_duplicates",
     "extract_digits_from_string",
     "extract_numbers_from_string",
@@ -4,14 +4,25 @@
 Functions for divisors and multiples.
 """
 
+import heapq
 import math
+from array import array
+from itertools import product
+from typing import Callable, NamedTuple
 
 try:
     import gmpy2
 except ImportError:
     gmpy2 = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from pchjlib.utils import InvalidInputError, MathError
+from pchjlib.prime_factorization import factorization
+from pchjlib.primes import _small_primes
 
 
 def sum_of_divisors(input_number: int) -> int:
@@ -27,6 +38,10 @@ def sum_of_divisors(input_number: int) -> int:
     Raises:
         - InvalidInputError: If number is not a positive integer.
 
+    Notes:
+        - Uses sigma(n) = prod((p**(e + 1) - 1) // (p - 1)) over the prime
+          powers p**e of n (see `factorization`), then subtracts n.
+
     Example:
         >>> sum_of_divisors(6)
         6
@@ -35,7 +50,355 @@ def sum_of_divisors(input_number: int) -> int:
         raise InvalidInputError("Number must be an integer")
     if input_number <= 0:
         raise InvalidInputError("Number must be positive")
-    return sum(i for i in range(1, input_number) if input_number % i == 0)
+    if input_number == 1:
+        return 0
+    sigma = 1
+    for p, e in factorization(input_number):
+        sigma *= (p ** (e + 1) - 1) // (p - 1)
+    return sigma - input_number
+
+
+def build_sigma_table(limit: int) -> array:
+    """
+    Build a table of divisor sums sigma(i) for 0 <= i <= limit.
+
+    Parameters:
+        - limit (int): The upper bound of the table.
+
+    Returns:
+        - array.array: The table (typecode 'Q'), where table[i] is the sum of
+          all positive divisors of i, including i (table[0] is 0).
+
+    Raises:
+        - InvalidInputError: If limit is not a positive integer.
+
+    Notes:
+        - sigma is multiplicative, so the table starts at 1 and each prime
+          power p**k <= limit rescales the slice of its multiples from
+          sigma(p**(k-1)) to sigma(p**k): O(limit log log limit) element
+          updates in all, against one `sum_of_divisors` call per entry.
+        - sum_of_divisors(i) == table[i] - i.
+
+    Example:
+        >>> list(build_sigma_table(6))
+        [0, 1, 3, 4, 7, 6, 12]
+    """
+    if not isinstance(limit, int):
+        raise InvalidInputError("Limit must be an integer")
+    if limit < 1:
+        raise InvalidInputError("Limit must be positive")
+    table = array("Q", [1]) * (limit + 1)
+    table[0] = 0
+    for p in _small_primes(limit):
+        prev, pk = 1, p
+        while pk <= limit:
+            cur = prev + pk
+            table[pk::pk] = array("Q", [s // prev * cur for s in table[pk::pk]])
+            prev, pk = cur, pk * p
+    return table
+
+
+# Integers per segment of the multiplicative sieve.
+_SIEVE_SEGMENT = 1 << 18
+
+
+class PrimePowerRule(NamedTuple):
+    """
+    A number-theoretic function given by its values on prime powers.
+
+    Attributes:
+        - function (callable): function(p, k) = f(p**k) for prime p, k >= 1.
+        - additive (bool): f(m * n) = f(m) + f(n) for coprime m, n instead
+          of f(m) * f(n).
+        - vectorized (bool): function(p, 1) also accepts a NumPy array of
+          primes, which lets the NumPy backend evaluate the primes above
+          sqrt(limit) in one call.
+    """
+
+    function: Callable
+    additive: bool = False
+    vectorized: bool = False
+
+
+def _sigma_k_function(s: int):
+    def function(p, k):
+        # Plain arithmetic only, so p may also be a NumPy array.
+        step = p**s
+        total = term = step**0
+        for _ in range(k):
+            term = term * step
+            total = total + term
+        return total
+
+    return function
+
+
+def sigma_k_rule(s: int) -> PrimePowerRule:
+    """
+    Return the prime-power rule of the divisor function sigma_s.
+
+    sigma_s(p**k) = 1 + p**s + ... + p**(k*s); s = 0 counts divisors and
+    s = 1 sums them.
+    """
+    if not isinstance(s, int) or s < 0:
+        raise InvalidInputError("Exponent must be a non-negative integer")
+    return PrimePowerRule(_sigma_k_function(s), vectorized=True)
+
+
+# Ready-made rules for multiplicative_sieve: tau(p**k) = k + 1, Euler's
+# phi(p**k) = p**(k - 1) * (p - 1), Moebius mu(p**k) = -1 if k == 1 else 0,
+# and the additive omega(p**k) = 1 (distinct prime factors).
+tau_rule = PrimePowerRule(lambda p, k: k + 1, vectorized=True)
+phi_rule = PrimePowerRule(lambda p, k: p ** (k - 1) * (p - 1), vectorized=True)
+mu_rule = PrimePowerRule(lambda p, k: -1 if k == 1 else 0, vectorized=True)
+omega_rule = PrimePowerRule(lambda p, k: 1, additive=True, vectorized=True)
+
+
+def _sieve_segment_python(lo, hi, function, base, additive):
+    """Values of function on lo .. hi as a list (pure Python backend)."""
+    rest = list(range(lo, hi + 1))
+    vals = [0 if additive else 1] * len(rest)
+    for p in base:
+        if p * p > hi:
+            break
+        at = [None]  # at[e] = function(p, e), filled on demand
+        for j in range(-lo % p, len(rest), p):
+            r, e = rest[j] // p, 1
+            while r % p == 0:
+                r, e = r // p, e + 1
+            rest[j] = r
+            while len(at) <= e:
+                at.append(function(p, len(at)))
+            vals[j] = vals[j] + at[e] if additive else vals[j] * at[e]
+    # What is left above 1 is a single prime above sqrt(hi).
+    for j, r in enumerate(rest):
+        if r > 1:
+            vals[j] = vals[j] + function(r, 1) if additive else vals[j] * function(r, 1)
+    return vals
+
+
+def _sieve_segment_numpy(lo, hi, function, base, additive, vectorized, dtype):
+    """Values of function on lo .. hi as an ndarray (NumPy backend)."""
+    rest = np.arange(lo, hi + 1, dtype=np.int64)
+    vals = np.full(len(rest), 0 if additive else 1, dtype=dtype)
+    for p in base:
+        if p * p > hi:
+            break
+        view = rest[-lo % p :: p]
+        if not len(view):
+            continue
+        exps = np.zeros(len(view), dtype=np.int64)
+        idx = np.arange(len(view))
+        # Divide p out of the multiples still divisible by it, one power
+        # at a time; each pass touches only the survivors of the last.
+        while len(idx):
+            view[idx] //= p
+            exps[idx] += 1
+            idx = idx[view[idx] % p == 0]
+        at = np.array(
+            [0 if additive else 1]
+            + [function(p, e) for e in range(1, int(exps.max()) + 1)],
+            dtype=dtype,
+        )
+        if additive:
+            vals[-lo % p :: p] += at[exps]
+        else:
+            vals[-lo % p :: p] *= at[exps]
+    big = np.flatnonzero(rest > 1)
+    large = rest[big]
+    if vectorized:
+        at = np.asarray(function(large, 1)).astype(dtype)
+    else:
+        at = np.fromiter((function(q, 1) for q in large.tolist()), dtype, len(big))
+    if additive:
+        vals[big] += at
+    else:
+        vals[big] *= at
+    return vals
+
+
+def _prime_power_rule(rule, additive):
+    """Validate a rule argument; return (function, additive, vectorized)."""
+    if isinstance(rule, PrimePowerRule):
+        function, default, vectorized = rule
+    elif callable(rule):
+        function, default, vectorized = rule, False, False
+    else:
+        raise InvalidInputError("Rule must be a PrimePowerRule or callable")
+    if not callable(function):
+        raise InvalidInputError("Rule function must be callable")
+    return function, default if additive is None else additive, vectorized
+
+
+def iter_multiplicative_sieve(
+    limit: int,
+    rule,
+    typecode: str = "q",
+    additive: bool = None,
+    segment_size: int = _SIEVE_SEGMENT,
+):
+    """
+    Lazily evaluate a multiplicative function on 1 .. limit, segment by segment.
+
+    Parameters:
+        - limit (int): The upper bound (inclusive).
+        - rule (PrimePowerRule | callable): The function on prime powers,
+          or a plain function(p, k) = f(p**k) for k >= 1 (see `tau_rule`,
+          `sigma_k_rule`, `phi_rule`, `mu_rule`, `omega_rule`).
+        - typecode (str): array typecode of the values. Defaults to "q".
+        - additive (bool, optional): Sum the prime-power values instead of
+          multiplying them. Defaults to rule.additive, or False for a plain
+          function.
+        - segment_size (int): Integers per segment.
+
+    Returns:
+        - generator: (first, values) pairs, where values is an array.array
+          and values[j] = f(first + j); the segments cover 1 .. limit.
+
+    Raises:
+        - InvalidInputError: If limit or segment_size is not a positive
+          integer, rule is neither a PrimePowerRule nor callable, or
+          typecode is not a numeric array typecode.
+
+    Notes:
+        - Each segment starts from rest[j] = first + j and divides out the
+          primes up to sqrt(limit) slice by slice, recording the exponent
+          of each; whatever stays above 1 is one prime past sqrt(limit).
+          Memory is the base primes plus one segment, so limit may exceed
+          RAM.
+        - With NumPy installed segments are sieved with array operations;
+          values then wrap on overflow instead of raising OverflowError.
+          The rule is always called with int primes unless it is marked
+          vectorized.
+
+    Example:
+        >>> segments = iter_multiplicative_sieve(6, phi_rule, segment_size=3)
+        >>> [list(values) for _, values in segments]
+        [[1, 1, 2], [2, 4, 2]]
+    """
+    if not isinstance(limit, int) or limit < 1:
+        raise InvalidInputError("Limit must be a positive integer")
+    function, additive, vectorized = _prime_power_rule(rule, additive)
+    if (
+        not isinstance(typecode, str)
+        or len(typecode) != 1
+        or typecode not in "bBhHiIlLqQfd"
+    ):
+        raise InvalidInputError("Typecode must be a numeric array typecode")
+    if not isinstance(segment_size, int) or segment_size < 1:
+        raise InvalidInputError("Segment size must be a positive integer")
+    return _iter_multiplicative_sieve(
+        limit, function, typecode, additive, vectorized, segment_size
+    )
+
+
+def _iter_multiplicative_sieve(
+    limit, function, typecode, additive, vectorized, segment_size
+):
+    base = _small_primes(math.isqrt(limit))
+    lo = 1
+    while lo <= limit:
+        hi = min(limit, lo + segment_size - 1)
+        if np is not None and hi < 1 << 62:
+            vals = _sieve_segment_numpy(
+                lo, hi, function, base, additive, vectorized, np.dtype(typecode)
+            )
+            yield lo, array(typecode, vals.tobytes())
+        else:
+            yield lo, array(
+                typecode, _sieve_segment_python(lo, hi, function, base, additive)
+            )
+        lo = hi + 1
+
+
+def multiplicative_sieve(
+    limit: int, rule, typecode: str = "q", additive: bool = None
+) -> array:
+    """
+    Build a table of a multiplicative function f(i) for 0 <= i <= limit.
+
+    Parameters:
+        - limit (int): The upper bound of the table.
+        - rule (PrimePowerRule | callable): The function on prime powers,
+          or a plain function(p, k) = f(p**k) for k >= 1 (see `tau_rule`,
+          `sigma_k_rule`, `phi_rule`, `mu_rule`, `omega_rule`).
+        - typecode (str): array typecode of the table. Defaults to "q".
+        - additive (bool, optional): Sum the prime-power values instead of
+          multiplying them. Defaults to rule.additive, or False for a plain
+          function.
+
+    Returns:
+        - array.array: The table, where table[i] = f(i) (table[0] is 0).
+
+    Raises:
+        - InvalidInputError: As for `iter_multiplicative_sieve`.
+
+    Notes:
+        - Joins the segments of `iter_multiplicative_sieve`; use that
+          directly when the table does not fit in memory.
+
+    Example:
+        >>> list(multiplicative_sieve(10, mu_rule))
+        [0, 1, -1, -1, 0, -1, 1, -1, 0, 0, 1]
+        >>> multiplicative_sieve(12, sigma_k_rule(2))[12]
+        210
+    """
+    segments = iter_multiplicative_sieve(limit, rule, typecode, additive)
+    table = array(typecode, [0])
+    for _, values in segments:
+        table.extend(values)
+    return table
+
+
+def _iter_divisors(n: int, ascending: bool):
+    pairs = factorization(n) if n > 1 else []
+    if not ascending:
+        for powers in product(*[[p**k for k in range(e + 1)] for p, e in pairs]):
+            yield math.prod(powers)
+        return
+    # Each divisor d (exponent vector v) is pushed once, by its parent: d
+    # divided by its largest prime p_j. Its children multiply by p_j again
+    # (while the exponent allows) or by any larger prime, so every child
+    # exceeds its parent and popping the heap yields them in order.
+    heap = [(1, -1, 0)]
+    while heap:
+        d, j, count = heapq.heappop(heap)
+        yield d
+        if j >= 0 and count < pairs[j][1]:
+            heapq.heappush(heap, (d * pairs[j][0], j, count + 1))
+        for i in range(j + 1, len(pairs)):
+            heapq.heappush(heap, (d * pairs[i][0], i, 1))
+
+
+def iter_divisors(input_number: int, sorted: bool = True):
+    """
+    Lazily yield the positive divisors of a number.
+
+    Parameters:
+        - input_number (int): The number (its sign is ignored).
+        - sorted (bool): If True, yield in increasing order; otherwise in
+          an arbitrary order, slightly faster.
+
+    Returns:
+        - generator: The positive divisors of abs(input_number).
+
+    Raises:
+        - InvalidInputError: If number is not an integer or is zero.
+
+    Notes:
+        - Divisors are products of the prime powers from `factorization`.
+          In sorted mode a heap holds only the frontier of pending
+          divisors, so the first ones arrive without listing the rest.
+
+    Example:
+        >>> list(iter_divisors(12))
+        [1, 2, 3, 4, 6, 12]
+    """
+    if not isinstance(input_number, int):
+        raise InvalidInputError("Input must be an integer")
+    if input_number == 0:
+        raise InvalidInputError("Number cannot be zero")
+    return _iter_divisors(abs(input_number), sorted)
 
 
 def generate_divisor_list(input_number: int, positive_only: bool = True) -> list:
@@ -52,19 +415,18 @@ def generate_divisor_list(input_number: int, positive_only: bool = True) -> list
     Raises:
         - InvalidInputError: If number is not an integer or is zero.
 
+    Notes:
+        - Built from the prime factorization (see `iter_divisors`), so the
+          cost follows the number of divisors rather than the number.
+
     Example:
         >>> generate_divisor_list(6)
         [1, 2, 3, 6]
     """
-    if not isinstance(input_number, int):
-        raise InvalidInputError("Input must be an integer")
-    if input_number == 0:
-        raise InvalidInputError("Number cannot be zero")
-    abs_number = abs(input_number)
-    divisors = [i for i in range(1, abs_number + 1) if abs_number % i == 0]
+    divisors = sorted(iter_divisors(input_number, sorted=False))
     if not positive_only:
-        divisors += [-i for i in divisors]
-    return sorted(divisors)
+        divisors = [-i for i in reversed(divisors)] + divisors
+    return divisors
 
 
 def generate_multiple_list(
@@ -116,22 +478,15 @@ def common_divisors(numbers: list) -> list:
         - InvalidInputError: If input is not a list or contains non-integers.
         - MathError: If list has fewer than 2 non-zero elements.
 
+    Notes:
+        - The common divisors are exactly the divisors of the gcd, so only
+          `greatest_common_divisor(numbers)` is factorized.
+
     Example:
         >>> common_divisors([12, 18])
         [1, 2, 3, 6]
     """
-    if not isinstance(numbers, (list, tuple)):
-        raise InvalidInputError("Input must be a list or tuple")
-    if len([n for n in numbers if n != 0]) < 2:
-        raise MathError("List must have at least 2 non-zero elements")
-    for num in numbers:
-        if not isinstance(num, int):
-            raise InvalidInputError("All elements must be integers")
-    divisors = set(generate_divisor_list(abs(numbers[0])))
-    for num in numbers[1:]:
-        if num != 0:
-            divisors.intersection_update(generate_divisor_list(abs(num)))
-    return sorted(list(divisors))
+    return generate_divisor_list(int(greatest_common_divisor(numbers)))
 
 
 def greatest_common_divisor(numbers: list) -> int:
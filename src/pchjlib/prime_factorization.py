@@ -5,83 +5,1564 @@ Functions for prime factorization.
 """
 
 import math
+import multiprocessing
 import random
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import NamedTuple
 
-from pchjlib.utils import InvalidInputError, MathError
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pchjlib.utils import InvalidInputError, MathError, OutOfRangeError
 from pchjlib.primes import is_prime  # For checking if factor is prime
+from pchjlib.primes import (
+    _check_workers,
+    _iroot,
+    _small_primes,
+    generate_prime_list,
+    iter_primes,
+)
+
+# Smallest-prime-factor table shared by prime_factors and prime_factors_many:
+# _spf_table[n] is the least prime dividing n. Empty until build_spf_table.
+_spf_table = array("I")
+# prime_factors_many grows the shared table up to this bound on its own.
+_SPF_BATCH_LIMIT = 10**7
+# Larger values in a batch have every prime up to this bound removed at
+# once with a product/remainder tree; the primorial is built on first use.
+_TREE_PRIME_LIMIT = 1 << 20
+_tree_primorial = None
+# Largest chunk prime_factors_many hands to one worker when it sizes chunks
+# itself.
+_MAX_CHUNK = 1024
+# Process-wide factorization cache: n -> (((p, e), ...), charged bytes), in
+# least recently used order. Entries are evicted once the charged sizes
+# exceed the byte budget in _factor_cache_stats["max_bytes"].
+_factor_cache = OrderedDict()
+_factor_cache_lock = threading.Lock()
+_factor_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "bytes": 0,
+    "max_bytes": 1 << 24,
+}
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag for `prime_factors`.
+
+    Another thread calls cancel(); the factorization notices at its next
+    checkpoint and returns a PartialFactorization.
+
+    Example:
+        >>> token = CancellationToken()
+        >>> token.cancel()
+        >>> token.cancelled
+        True
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
 
+    def cancel(self) -> None:
+        """Request cancellation."""
+        self._event.set()
 
-def _gcd(a: int, b: int) -> int:
-    while b:
-        a, b = b, a % b
-    return a
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._event.is_set()
 
 
-def _pollard_rho(n: int) -> int:
+class PartialFactorization(NamedTuple):
     """
-    Pollard's Rho to find a non-trivial factor.
+    What `prime_factors` had found when its time budget ran out or it was
+    cancelled: the primes so far, the unfactored composite cofactor, and
+    the stage that was running ("trial division", "p-1", "p+1", "rho",
+    "ecm" or "siqs").
     """
-    if n % 2 == 0:
-        return 2
-    if n % 3 == 0:
-        return 3
-    x = random.randint(1, n - 1)
-    y = x
-    c = random.randint(1, n - 1)
-    d = 1
-    while d == 1:
-        x = (x * x + c) % n
-        y = (y * y + c) % n
-        y = (y * y + c) % n
-        d = _gcd(abs(x - y), n)
-        if d == n:
-            return _pollard_rho(n)  # Retry if failed
-    return d
-
-
-def prime_factors(input_number: int) -> list:
+
+    factors: list
+    cofactor: int
+    stage: str
+
+
+class _Interrupted(Exception):
+    """Raised at a checkpoint once the deadline passes or the token fires."""
+
+    def __init__(self, stage: str):
+        super().__init__(stage)
+        self.stage = stage
+        self.factors = []
+        self.remaining = None
+
+
+class _Deadline:
+    """
+    Time limit, cancellation token and/or cross-process stop event checked
+    by the factoring stages.
+    """
+
+    def __init__(
+        self, timeout: float = None, token: CancellationToken = None, stop=None
+    ):
+        self.expires = None if timeout is None else time.monotonic() + timeout
+        self.token = token
+        self.stop = stop
+
+    def check(self, stage: str) -> None:
+        if (
+            (self.token is not None and self.token.cancelled)
+            or (self.stop is not None and self.stop.is_set())
+            or (self.expires is not None and time.monotonic() >= self.expires)
+        ):
+            raise _Interrupted(stage)
+
+
+# In an ECM/SIQS pool worker: a _Deadline on the pool's stop event.
+_worker_deadline = None
+
+
+def _init_worker(stop) -> None:
+    """Pool initializer: make the worker's tasks check the stop event."""
+    global _worker_deadline
+    _worker_deadline = _Deadline(stop=stop)
+
+
+def _stoppable_pool(workers: int) -> tuple:
+    """
+    Return (pool, stop): a process pool whose ECM and SIQS tasks give up at
+    their next checkpoint once stop.set() is called. shutdown() alone only
+    cancels tasks that have not started, so the owner sets stop on exit to
+    free the workers instead of leaving them to finish their curves.
+    """
+    stop = multiprocessing.Event()
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(stop,))
+    return pool, stop
+
+
+def _wait_first(pending: set, deadline: _Deadline, stage: str) -> tuple:
+    """Wait for the first finished future, checking the deadline every 50 ms."""
+    if deadline is None:
+        return wait(pending, return_when=FIRST_COMPLETED)
+    while True:
+        deadline.check(stage)
+        done, pending = wait(pending, 0.05, return_when=FIRST_COMPLETED)
+        if done:
+            return done, pending
+
+
+def _to_pairs(factors: list) -> tuple:
+    """Collapse a sorted list of primes into ((prime, exponent), ...)."""
+    pairs = []
+    for p in factors:
+        if pairs and pairs[-1][0] == p:
+            pairs[-1][1] += 1
+        else:
+            pairs.append([p, 1])
+    return tuple((p, e) for p, e in pairs)
+
+
+def _from_pairs(pairs: tuple) -> list:
+    """Expand ((prime, exponent), ...) back into a sorted list of primes."""
+    return [p for p, e in pairs for _ in range(e)]
+
+
+def _cache_get(n: int):
+    """Look n up in the factorization cache; return its pairs or None."""
+    with _factor_cache_lock:
+        entry = _factor_cache.get(n)
+        if entry is None:
+            _factor_cache_stats["misses"] += 1
+            return None
+        _factor_cache.move_to_end(n)
+        _factor_cache_stats["hits"] += 1
+        return entry[0]
+
+
+def _cache_put(n: int, pairs: tuple) -> None:
+    """Store the factorization of n, evicting least recently used entries."""
+    size = sys.getsizeof(n) + sys.getsizeof(pairs)
+    size += sum(sys.getsizeof(pair) + sys.getsizeof(pair[0]) for pair in pairs)
+    stats = _factor_cache_stats
+    with _factor_cache_lock:
+        if n in _factor_cache or size > stats["max_bytes"]:
+            return
+        while stats["bytes"] + size > stats["max_bytes"]:
+            _, (_, freed) = _factor_cache.popitem(last=False)
+            stats["bytes"] -= freed
+            stats["evictions"] += 1
+        _factor_cache[n] = (pairs, size)
+        stats["bytes"] += size
+
+
+def _pollard_brent(n: int, budget: int = 0, deadline: _Deadline = None) -> int:
+    """
+    Find a non-trivial factor of an odd composite n with Brent's Pollard rho.
+
+    Products of m successive |x - y| values are accumulated mod n before each
+    gcd; if the batched gcd overshoots to n, the last batch is replayed one
+    step at a time. A new polynomial is tried when a cycle yields only n.
+    With a budget, returns 0 once about that many steps have been spent.
+    """
+    if gmpy2 is not None:
+        n = gmpy2.mpz(n)  # pyright: ignore[reportAttributeAccessIssue]
+        gcd = gmpy2.gcd  # pyright: ignore[reportAttributeAccessIssue]
+    else:
+        gcd = math.gcd
+    m = 128
+    steps = 0
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            if budget and steps > budget:
+                return 0
+            steps += 2 * r
+            x = y
+            for k in range(0, r, m):
+                if deadline is not None:
+                    deadline.check("rho")
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                if deadline is not None:
+                    deadline.check("rho")
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * (x - y) % n
+                g = gcd(q, n)
+                k += m
+            r <<= 1
+        if g == n:
+            while True:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+                if g > 1:
+                    break
+        if g != n:
+            return int(g)
+
+
+# Pollard p - 1 and Williams p + 1: stage 1 covers the prime powers up to
+# B1, stage 2 a single further prime up to B2.
+_PM1_B1 = 20000
+_PM1_B2 = 1000000
+# Stage-2 giant-step width for p - 1, p + 1 and ECM; baby steps are the
+# j < D/2 coprime to D.
+_STAGE2_D = 2310
+# Williams p + 1 starting values 2/7 and 6/5 (mod n): with them the Lucas
+# sequences live in the order p + 1 group when 3 | p + 1 or 4 | p + 1.
+_PP1_SEEDS = ((2, 7), (6, 5))
+
+
+def _stage1_exponents(B1: int):
+    """Yield the product of all prime powers <= B1 in chunks of ~1024 bits."""
+    chunk = 1
+    for p in generate_prime_list(B1):
+        q = p
+        while q * p <= B1:
+            q *= p
+        chunk *= q
+        if chunk.bit_length() > 1024:
+            yield chunk
+            chunk = 1
+    if chunk > 1:
+        yield chunk
+
+
+def _lucas_v(k: int, v: int, n: int) -> int:
+    """Lucas sequence V_k(v, 1) mod n, via V_2m = V_m**2 - 2 and V_2m+1."""
+    x, y = v, (v * v - 2) % n
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x, y = (x * y - v) % n, (y * y - 2) % n
+        else:
+            x, y = (x * x - 2) % n, (x * y - v) % n
+    return x
+
+
+def _lucas_stage2(
+    n: int, v: int, B1: int, B2: int, deadline: _Deadline = None, stage: str = ""
+) -> int:
+    """
+    Shared stage 2 of p - 1 and p + 1, given v = a + 1/a after stage 1.
+
+    For each prime q in (B1, B2], written q = m*D +- j as in the ECM stage
+    2, V_mD(v) - V_j(v) vanishes mod p when a**q = 1 (mod p). All the
+    differences go into one product and a single gcd.
+    """
+    D = _STAGE2_D
+    half = D // 2
+    v2 = (v * v - 2) % n
+    baby = [None] * (half + 1)
+    prev, cur = v, (v2 * v - v) % n
+    baby[1] = v
+    for j in range(3, half + 1, 2):
+        if math.gcd(j, D) == 1:
+            baby[j] = cur
+        prev, cur = cur, (cur * v2 - prev) % n
+    vd = _lucas_v(D, v, n)
+    m = max(1, (B1 + half) // D)
+    vm, vn = _lucas_v(m * D, v, n), _lucas_v((m + 1) * D, v, n)
+    acc = 1
+    for q in iter_primes(B1 + 1, B2):
+        target = (q + half) // D
+        while m < target:
+            vm, vn = vn, (vn * vd - vm) % n
+            m += 1
+            if deadline is not None:
+                deadline.check(stage)
+        acc = acc * (vm - baby[abs(q - m * D)]) % n
+    g = math.gcd(acc, n)
+    return g if 1 < g < n else 0
+
+
+def _pm1(
+    n: int, B1: int = _PM1_B1, B2: int = _PM1_B2, deadline: _Deadline = None
+) -> int:
+    """Pollard's p - 1 on n; return a non-trivial factor or 0."""
+    a = 2
+    for e in _stage1_exponents(B1):
+        if deadline is not None:
+            deadline.check("p-1")
+        a = pow(a, e, n)
+    g = math.gcd(a - 1, n)
+    if g != 1:
+        return g if g != n else 0
+    return _lucas_stage2(n, (a + pow(a, -1, n)) % n, B1, B2, deadline, "p-1")
+
+
+def _pp1(
+    n: int, B1: int = _PM1_B1, B2: int = _PM1_B2, deadline: _Deadline = None
+) -> int:
+    """Williams' p + 1 on n (one pass per seed); return a factor or 0."""
+    for num, den in _PP1_SEEDS:
+        v = num * pow(den, -1, n) % n
+        for e in _stage1_exponents(B1):
+            if deadline is not None:
+                deadline.check("p+1")
+            v = _lucas_v(e, v, n)
+        g = math.gcd(v - 2, n)
+        if g != 1:
+            if g != n:
+                return g
+            continue
+        g = _lucas_stage2(n, v, B1, B2, deadline, "p+1")
+        if g:
+            return g
+    return 0
+
+
+# Elliptic-curve stage: (factor digits, B1, curves) per level. Stage 2
+# covers primes up to 100 * B1.
+_ECM_SCHEDULE = (
+    (15, 2000, 25),
+    (20, 11000, 90),
+    (25, 50000, 300),
+    (30, 250000, 700),
+    (35, 1000000, 1800),
+)
+# Brent rho steps tried before a composite is handed to ECM.
+_RHO_BUDGET = 1 << 17
+
+
+def _ladder(k: int, x: int, z: int, a24: int, n: int) -> tuple:
+    """Multiply the point (x : z) by k on a Montgomery curve (Montgomery ladder)."""
+    x1, z1 = x, z
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    x2, z2 = s * d % n, t * (d + a24 * t) % n
+    for bit in bin(k)[3:]:
+        u = (x1 - z1) * (x2 + z2)
+        v = (x1 + z1) * (x2 - z2)
+        xs, zs = z * (u + v) ** 2 % n, x * (u - v) ** 2 % n
+        if bit == "1":
+            s = (x2 + z2) * (x2 + z2) % n
+            d = (x2 - z2) * (x2 - z2) % n
+            t = s - d
+            x1, z1 = xs, zs
+            x2, z2 = s * d % n, t * (d + a24 * t) % n
+        else:
+            s = (x1 + z1) * (x1 + z1) % n
+            d = (x1 - z1) * (x1 - z1) % n
+            t = s - d
+            x2, z2 = xs, zs
+            x1, z1 = s * d % n, t * (d + a24 * t) % n
+    return x1, z1
+
+
+def _ecm_curve(
+    n: int, B1: int, B2: int, sigma: int, deadline: _Deadline = None
+) -> int:
+    """
+    Run one ECM curve on n; return a non-trivial factor or 0.
+
+    The curve is the Montgomery form given by Suyama's parametrization for
+    sigma (group order divisible by 12). Stage 1 multiplies the start point
+    by every prime power <= B1; stage 2 looks for one more prime q in
+    (B1, B2] by baby-step/giant-step, writing q = m*D +- j and multiplying
+    the cross products X(mDQ)Z(jQ) - X(jQ)Z(mDQ) into a single gcd.
+    """
+    if gmpy2 is not None:
+        n = gmpy2.mpz(n)  # pyright: ignore[reportAttributeAccessIssue]
+        gcd = gmpy2.gcd  # pyright: ignore[reportAttributeAccessIssue]
+    else:
+        gcd = math.gcd
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x, z = pow(u, 3, n), pow(v, 3, n)
+    den = 4 * x * v % n
+    g = gcd(den, n)
+    if g != 1:
+        return int(g) if 1 < g < n else 0
+    # a24 = (A + 2) / 4 = (v - u)^3 (3u + v) / (16 u^3 v)
+    a24 = pow(v - u, 3, n) * (3 * u + v) * pow(4 * den, -1, n) % n
+
+    # Stage 1
+    for i, p in enumerate(_small_primes(B1)):
+        if deadline is not None and i % 256 == 0:
+            deadline.check("ecm")
+        q = p
+        while q * p <= B1:
+            q *= p
+        x, z = _ladder(q, x, z, a24, n)
+    g = gcd(z, n)
+    if g != 1:
+        return int(g) if 1 < g < n else 0
+
+    # Stage 2: baby steps jQ for odd j < D/2, then giant steps mDQ.
+    D = _STAGE2_D
+    half = D // 2
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    x2, z2 = s * d % n, t * (d + a24 * t) % n
+    baby = [None] * (half + 1)
+    baby[1] = prev = (x, z)
+    cur = _ladder(3, x, z, a24, n)
+    for j in range(3, half + 1, 2):
+        if math.gcd(j, D) == 1:
+            baby[j] = cur
+        # (j + 2)Q = jQ + 2Q, with difference (j - 2)Q
+        u = (cur[0] - cur[1]) * (x2 + z2)
+        w = (cur[0] + cur[1]) * (x2 - z2)
+        prev, cur = cur, (prev[1] * (u + w) ** 2 % n, prev[0] * (u - w) ** 2 % n)
+    dx, dz = _ladder(D, x, z, a24, n)
+    m = max(1, (B1 + half) // D)
+    rx, rz = _ladder(m * D, x, z, a24, n)
+    nx, nz = _ladder((m + 1) * D, x, z, a24, n)
+    acc = 1
+    for q in iter_primes(B1 + 1, B2):
+        target = (q + half) // D
+        while m < target:
+            # R_(m+2) = R_(m+1) + DQ, with difference R_m
+            u = (nx - nz) * (dx + dz)
+            w = (nx + nz) * (dx - dz)
+            rx, rz, nx, nz = nx, nz, rz * (u + w) ** 2 % n, rx * (u - w) ** 2 % n
+            m += 1
+            if deadline is not None:
+                deadline.check("ecm")
+        bx, bz = baby[abs(q - m * D)]
+        acc = acc * (rx * bz - bx * rz) % n
+    g = gcd(acc, n)
+    return int(g) if 1 < g < n else 0
+
+
+def _ecm_curves(n: int, B1: int, B2: int, sigmas: list) -> int:
+    """
+    Worker task: try each sigma in turn and return the first factor, or 0
+    (also once the pool's stop event is set).
+    """
+    try:
+        for sigma in sigmas:
+            d = _ecm_curve(n, B1, B2, sigma, _worker_deadline)
+            if d:
+                return d
+    except _Interrupted:
+        pass
+    return 0
+
+
+def _ecm(
+    n: int, workers: int = 1, max_digits: int = None, deadline: _Deadline = None
+) -> int:
+    """
+    Find a factor of the composite n with the elliptic-curve method.
+
+    Levels of _ECM_SCHEDULE (up to max_digits, if given) are tried in order;
+    with workers > 1 each level's curves are dealt out to a process pool in
+    small batches, and the first factor found cancels the batches not yet
+    started. Returns 0 if every level fails.
+    """
+    rng = random.Random()
+    schedule = [
+        (B1, curves)
+        for digits, B1, curves in _ECM_SCHEDULE
+        if max_digits is None or digits <= max_digits
+    ]
+    if workers <= 1:
+        for B1, curves in schedule:
+            for _ in range(curves):
+                sigma = rng.randrange(6, 1 << 32)
+                d = _ecm_curve(n, B1, 100 * B1, sigma, deadline)
+                if d:
+                    return d
+        return 0
+    # Not a with-block: on success or interruption, stop the curves still
+    # running and return without waiting for them.
+    pool, stop = _stoppable_pool(workers)
+    try:
+        for B1, curves in schedule:
+            batch = max(1, curves // (4 * workers))
+            pending = {
+                pool.submit(
+                    _ecm_curves,
+                    n,
+                    B1,
+                    100 * B1,
+                    [rng.randrange(6, 1 << 32) for _ in range(batch)],
+                )
+                for _ in range(0, curves, batch)
+            }
+            while pending:
+                done, pending = _wait_first(pending, deadline, "ecm")
+                for future in done:
+                    d = future.result()
+                    if d:
+                        return d
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    return 0
+
+
+# Self-initializing quadratic sieve parameters by decimal digits of k*n:
+# (digits, factor base size, sieve half-width M).
+_SIQS_PARAMS = (
+    (24, 100, 8192),
+    (30, 200, 16384),
+    (36, 300, 32768),
+    (42, 600, 32768),
+    (48, 1000, 65536),
+    (54, 2400, 65536),
+    (60, 4000, 98304),
+    (66, 6000, 98304),
+    (72, 9000, 131072),
+    (78, 14000, 131072),
+    (84, 20000, 196608),
+    (90, 30000, 196608),
+)
+# Factor-base primes below this are trial-divided but not sieved.
+_SIQS_SMALL = 30
+# Relations collected beyond the number of matrix columns.
+_SIQS_EXTRA = 16
+# Cofactors below this multiple of the largest base prime are kept as
+# partial relations (one large prime).
+_SIQS_LARGE = 64
+# Sieve threshold slack, in multiples of log2 of the largest base prime.
+_SIQS_SLACK = 2.4
+# Largest number tried with the sieve from prime_factors.
+_SIQS_MAX_DIGITS = 100
+
+
+def _sqrt_mod(a: int, p: int) -> int:
+    """Square root of the quadratic residue a modulo the prime p (Tonelli-Shanks)."""
+    a %= p
+    if p == 2 or a == 0:
+        return a
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c = i, b * b % p
+        t, r = t * c % p, r * b % p
+    return r
+
+
+def _siqs_multiplier(n: int) -> int:
+    """Pick a small multiplier k so that k*n has many small residue primes."""
+    primes = _small_primes(1000)
+    best, best_score = 1, -math.inf
+    for k in (1, 3, 5, 7, 11, 13, 15, 17, 19, 21, 23, 29, 31, 33, 35, 37, 39, 41):
+        kn = k * n
+        score = -0.5 * math.log(k)
+        if kn % 8 == 1:
+            score += 2 * math.log(2)
+        elif kn % 8 == 5:
+            score += math.log(2)
+        elif kn % 4 == 3:
+            score += 0.5 * math.log(2)
+        for p in primes[1:]:
+            if k % p == 0:
+                score += math.log(p) / p
+            elif pow(kn % p, (p - 1) // 2, p) == 1:
+                score += 2 * math.log(p) / (p - 1)
+        if score > best_score:
+            best, best_score = k, score
+    return best
+
+
+def _siqs_relations(
+    kn: int,
+    fb: list,
+    roots: list,
+    logs: list,
+    M: int,
+    threshold: int,
+    large: int,
+    s: int,
+    pool: list,
+    seed: int,
+    deadline: _Deadline = None,
+) -> list:
+    """
+    Sieve every polynomial of one randomly chosen SIQS family.
+
+    A is a product of s factor-base primes (s - 1 drawn from the pool of
+    indices, the last one picked to bring A close to sqrt(2kn)/M), and the
+    2**(s-1) values b with b**2 = kn (mod A) are walked in Gray-code order so
+    each switch updates the sieve roots with one addition per prime. Values
+    Q(x) = ((Ax + b)**2 - kn) / A over -M <= x < M that reach the sieve
+    threshold are trial-divided using the roots. Returns relations
+    (u, columns, L) with u**2 = L**2 * prod(column primes) (mod kn), where
+    column 0 is the sign of Q(x) and column j + 1 is fb[j]; L is 1 for full
+    relations and the leftover large prime for partial ones.
+    """
+    rng = random.Random(seed)
+    size = 2 * M
+    target = math.isqrt(2 * kn) // M
+    chosen = rng.sample(pool, s - 1)
+    a = math.prod(fb[j] for j in chosen)
+    # Complete A with the usable prime closest to the remaining quotient.
+    want = target // a
+    valid = [
+        j
+        for j in range(len(fb))
+        if fb[j] > _SIQS_SMALL and roots[j] and j not in chosen
+    ]
+    last = min(valid, key=lambda j: abs(fb[j] - want))
+    chosen.append(last)
+    a *= fb[last]
+
+    B = []
+    for j in chosen:
+        q = fb[j]
+        aq = a // q
+        g = roots[j] * pow(aq % q, -1, q) % q
+        if g > q // 2:
+            g = q - g
+        B.append(aq * g)
+    b = sum(B)
+
+    special = [j for j in range(len(fb)) if fb[j] < _SIQS_SMALL or not roots[j]]
+    special += chosen
+    active = [j for j in range(len(fb)) if j not in set(special)]
+    primes = [fb[j] for j in active]
+    lps = [logs[j] for j in active]
+    ainv = [pow(a % p, -1, p) for p in primes]
+    r1 = [ai * (roots[j] - b) % p for ai, j, p in zip(ainv, active, primes)]
+    r2 = [ai * (-roots[j] - b) % p for ai, j, p in zip(ainv, active, primes)]
+    deltas = [[2 * Bl * ai % p for ai, p in zip(ainv, primes)] for Bl in B]
+    if np is not None:
+        primes_np = np.array(primes, dtype=np.int64)
+        r1, r2 = np.array(r1, dtype=np.int64), np.array(r2, dtype=np.int64)
+        deltas = [np.array(d, dtype=np.int64) for d in deltas]
+        steps = np.concatenate((primes_np, primes_np))
+        weights = np.array(lps + lps, dtype=np.int64)
+
+    relations = []
+    for i in range(1 << (s - 1)):
+        if deadline is not None:
+            deadline.check("siqs")
+        if i:
+            # Gray-code step: flip the sign of B[l], l = trailing zeros of i.
+            l = (i & -i).bit_length() - 1
+            e = -1 if -(-i >> (l + 1)) % 2 else 1
+            b += 2 * e * B[l]
+            if np is not None:
+                r1 = (r1 - e * deltas[l]) % primes_np
+                r2 = (r2 - e * deltas[l]) % primes_np
+            else:
+                d = deltas[l]
+                r1 = [(r - e * dl) % p for r, dl, p in zip(r1, d, primes)]
+                r2 = [(r - e * dl) % p for r, dl, p in zip(r2, d, primes)]
+        c = (b * b - kn) // a
+
+        if np is not None:
+            # Every hit position of every prime at once: prime t owns the
+            # cnt[t] entries starting at off[t], spaced steps[t] apart.
+            starts = np.concatenate(((r1 + M) % primes_np, (r2 + M) % primes_np))
+            cnt = (size - 1 - starts) // steps + 1
+            off = np.cumsum(cnt) - cnt
+            hits = np.repeat(starts - steps * off, cnt)
+            hits += np.repeat(steps, cnt) * np.arange(hits.size)
+            sieve = np.bincount(hits, np.repeat(weights, cnt), minlength=size)
+            hits = np.flatnonzero(sieve >= threshold).tolist()
+        else:
+            sieve = [0] * size
+            for p, lp, x1, x2 in zip(primes, lps, r1, r2):
+                for k in range((x1 + M) % p, size, p):
+                    sieve[k] += lp
+                if x2 != x1:
+                    for k in range((x2 + M) % p, size, p):
+                        sieve[k] += lp
+            hits = [k for k in range(size) if sieve[k] >= threshold]
+
+        for k in hits:
+            x = k - M
+            q = (a * x + 2 * b) * x + c
+            cols = [j + 1 for j in chosen]
+            if q < 0:
+                q = -q
+                cols.append(0)
+            for j in special:
+                p = fb[j]
+                while q % p == 0:
+                    q //= p
+                    cols.append(j + 1)
+            if np is not None:
+                xm = x % primes_np
+                divisors = np.flatnonzero((xm == r1) | (xm == r2)).tolist()
+            else:
+                divisors = [
+                    t
+                    for t, (p, y1, y2) in enumerate(zip(primes, r1, r2))
+                    if x % p in (y1, y2)
+                ]
+            for t in divisors:
+                p = primes[t]
+                while q % p == 0:
+                    q //= p
+                    cols.append(active[t] + 1)
+            if q == 1 or q < large:
+                relations.append((a * x + b, cols, q))
+    return relations
+
+
+def _siqs_dependencies(masks: list) -> list:
+    """
+    Find subsets of rows summing to zero over GF(2).
+
+    Each row is a packed bit vector (an int). Rows are reduced in turn
+    against pivots keyed by their lowest set bit while a second int records
+    which original rows were combined; a row that reduces to zero yields its
+    record as a dependency.
+    """
+    pivots = {}
+    dependencies = []
+    for i, row in enumerate(masks):
+        history = 1 << i
+        while row:
+            low = row & -row
+            pivot = pivots.get(low)
+            if pivot is None:
+                pivots[low] = (row, history)
+                break
+            row ^= pivot[0]
+            history ^= pivot[1]
+        else:
+            dependencies.append(history)
+    return dependencies
+
+
+def _siqs_task(*args) -> list:
+    """
+    Worker task: _siqs_relations for one family, or no relations once the
+    pool's stop event is set.
+    """
+    try:
+        return _siqs_relations(*args, _worker_deadline)
+    except _Interrupted:
+        return []
+
+
+def _siqs(
+    n: int,
+    factor_base_size: int = None,
+    workers: int = 1,
+    deadline: _Deadline = None,
+) -> int:
+    """
+    Find a factor of the odd composite n (not a perfect power) with SIQS.
+
+    Returns 0 if every dependency of the collected relations is trivial.
+    """
+    k = _siqs_multiplier(n)
+    kn = k * n
+    digits = len(str(kn))
+    F, M = next(
+        ((f, m) for d, f, m in _SIQS_PARAMS if digits <= d), _SIQS_PARAMS[-1][1:]
+    )
+    if factor_base_size is not None:
+        F = factor_base_size
+
+    # Factor base: primes p with kn a square mod p (and those dividing k).
+    fb, roots = [], []
+    bound = 4 * F * max(1, F.bit_length()) + 100
+    for p in _small_primes(bound):
+        if n % p == 0:
+            return p
+        if kn % p == 0 or p == 2 or pow(kn % p, (p - 1) // 2, p) == 1:
+            fb.append(p)
+            roots.append(_sqrt_mod(kn, p))
+            if len(fb) == F:
+                break
+    logs = [round(math.log2(p)) for p in fb]
+    pmax = fb[-1]
+    threshold = round(
+        math.log2(M) + kn.bit_length() / 2 - 0.5 - _SIQS_SLACK * math.log2(pmax)
+    )
+    large = pmax * _SIQS_LARGE
+
+    # A is a product of s primes near target**(1/s), ideally about 2000.
+    target = math.isqrt(2 * kn) // M
+    s = max(1, round(math.log(target) / math.log(2000)))
+    ideal = target ** (1 / s)
+    usable = [j for j in range(len(fb)) if fb[j] > _SIQS_SMALL and roots[j]]
+    pool = [j for j in usable if ideal / 2 <= fb[j] <= ideal * 2]
+    if len(pool) < s + 4:
+        pool = usable
+    args = (kn, fb, roots, logs, M, threshold, large, s, pool)
+
+    rng = random.Random()
+    relations, seen, partials = [], set(), {}
+    needed = len(fb) + 1 + _SIQS_EXTRA
+
+    def absorb(batch):
+        for u, cols, L in batch:
+            u %= n
+            if L == 1:
+                if u not in seen:
+                    seen.add(u)
+                    relations.append((u, cols, 1))
+                continue
+            other = partials.get(L)
+            if other is None:
+                partials[L] = (u, cols)
+            elif other[0] != u:
+                relations.append((u * other[0] % n, cols + other[1], L))
+
+    def solve():
+        masks = []
+        for _, cols, _ in relations:
+            mask = 0
+            for col in cols:
+                mask ^= 1 << col
+            masks.append(mask)
+        for dep in _siqs_dependencies(masks):
+            x = y = 1
+            counts = [0] * (len(fb) + 1)
+            for i in range(len(relations)):
+                if dep >> i & 1:
+                    u, cols, L = relations[i]
+                    x = x * u % n
+                    y = y * L % n
+                    for col in cols:
+                        counts[col] += 1
+            for j, e in enumerate(counts[1:]):
+                if e:
+                    y = y * pow(fb[j], e // 2, n) % n
+            g = math.gcd(x - y, n)
+            if 1 < g < n:
+                return g
+        return 0
+
+    if workers <= 1:
+        while True:
+            absorb(_siqs_relations(*args, rng.getrandbits(64), deadline))
+            if len(relations) >= needed:
+                g = solve()
+                if g:
+                    return g
+                needed += _SIQS_EXTRA
+    executor, stop = _stoppable_pool(workers)
+    try:
+        pending = {
+            executor.submit(_siqs_task, *args, rng.getrandbits(64))
+            for _ in range(2 * workers)
+        }
+        while True:
+            done, pending = _wait_first(pending, deadline, "siqs")
+            for future in done:
+                absorb(future.result())
+                pending.add(executor.submit(_siqs_task, *args, rng.getrandbits(64)))
+            if len(relations) >= needed:
+                g = solve()
+                if g:
+                    return g
+                needed += _SIQS_EXTRA
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _perfect_power(n: int) -> tuple:
+    """Return (root, k) with root**k == n for a prime k, or (n, 1)."""
+    for k in _small_primes(n.bit_length()):
+        root = _iroot(n, k)
+        if root > 1 and root**k == n:
+            return root, k
+    return n, 1
+
+
+def _find_factor(n: int, workers: int = 1, deadline: _Deadline = None) -> int:
+    """
+    Return a non-trivial factor of the composite n.
+
+    Above 64 bits, Pollard p - 1 and Williams p + 1 go first for factors
+    with smooth p -+ 1. Brent's rho then runs under a step budget. Numbers
+    in quadratic-sieve range then get a short ECM pass for factors up to a
+    third of their length before SIQS; larger ones go through the full ECM
+    schedule.
+    """
+    d = n.bit_length() > 64 and (
+        _pm1(n, deadline=deadline) or _pp1(n, deadline=deadline)
+    )
+    if not d:
+        d = _pollard_brent(n, _RHO_BUDGET, deadline)
+    if d:
+        return d
+    digits = len(str(n))
+    if digits <= _SIQS_MAX_DIGITS:
+        d = _ecm(n, workers, max(15, digits // 3), deadline)
+        d = d or _siqs(n, workers=workers, deadline=deadline)
+    else:
+        d = _ecm(n, workers, deadline=deadline)
+    return d or _pollard_brent(n, deadline=deadline)
+
+
+def _split_composite(
+    n: int, factors: list, workers: int = 1, deadline: _Deadline = None
+) -> None:
+    """
+    Append the prime factors of n (odd, no tiny factors) to factors.
+
+    Composite pieces are pushed back and split again until every piece passes
+    is_prime, using an explicit stack instead of recursion. Perfect powers
+    are reduced to their root first, since rho and ECM split them poorly.
+    If the deadline interrupts, the pieces still unsplit are recorded on
+    the exception.
+    """
+    stack = [n]
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors.append(m)
+            continue
+        root, k = _perfect_power(m)
+        if k > 1:
+            stack += [root] * k
+            continue
+        try:
+            d = _find_factor(m, workers, deadline)
+        except _Interrupted as stop:
+            stop.remaining = [m] + stack
+            raise
+        stack += (d, m // d)
+
+
+def build_spf_table(limit: int) -> array:
+    """
+    Build the process-wide smallest-prime-factor table for 0 .. limit.
+
+    Parameters:
+        - limit (int): The upper bound of the table (< 2**32).
+
+    Returns:
+        - array.array: The table (typecode 'I'), where table[n] is the
+          smallest prime factor of n for n >= 2.
+
+    Raises:
+        - InvalidInputError: If limit is not an integer >= 2.
+        - OutOfRangeError: If limit >= 2**32.
+
+    Notes:
+        - Once built, prime_factors(n) for n <= limit takes O(log n) table
+          lookups instead of trial division.
+
+    Example:
+        >>> build_spf_table(20)[18]
+        2
+    """
+    global _spf_table
+    if not isinstance(limit, int):
+        raise InvalidInputError("Limit must be an integer")
+    if limit < 2:
+        raise InvalidInputError("Limit must be >= 2")
+    if limit >= 1 << 32:
+        raise OutOfRangeError("Limit must be < 2**32")
+    table = array("I", range(limit + 1))
+    # Largest primes first, so each entry ends up with its smallest factor.
+    for p in reversed(_small_primes(math.isqrt(limit))):
+        start = p * p
+        table[start::p] = array("I", [p]) * ((limit - start) // p + 1)
+    _spf_table = table
+    return table
+
+
+def _factor_with_table(n: int, table: array) -> list:
+    """Factor n (2 <= n < len(table)) by repeated smallest-factor lookups."""
+    factors = []
+    while n > 1:
+        p = table[n]
+        factors.append(p)
+        n //= p
+    return factors
+
+
+def _product_tree(values: list) -> list:
+    """Levels of the product tree of values, leaves first, root last."""
+    tree = [values]
+    while len(values) > 1:
+        values = [math.prod(values[i : i + 2]) for i in range(0, len(values), 2)]
+        tree.append(values)
+    return tree
+
+
+def _remainder_tree(x: int, tree: list) -> list:
+    """Return x mod each leaf of tree, reducing level by level from the root."""
+    rems = [x % tree[-1][0]]
+    for level in reversed(tree[:-1]):
+        rems = [rems[i >> 1] % v for i, v in enumerate(level)]
+    return rems
+
+
+def _small_prime_divisors(g: int, table: array) -> list:
+    """Distinct primes of the squarefree g, all below _TREE_PRIME_LIMIT."""
+    primes = []
+    stack = [g]
+    while stack:
+        m = stack.pop()
+        if m == 1:
+            continue
+        if m < len(table):
+            primes += _factor_with_table(m, table)
+        elif is_prime(m):
+            primes.append(m)
+        else:
+            d = 2 if m % 2 == 0 else _pollard_brent(m)
+            stack += (d, m // d)
+    return primes
+
+
+def _strip_small_primes(values: list, table: array) -> list:
+    """
+    Remove every prime below _TREE_PRIME_LIMIT from each value.
+
+    Bernstein's batch method: the product of all those primes is reduced
+    modulo every value at once down a product tree of the batch, and
+    gcd(value, primorial mod value) is the product of the small primes
+    dividing it. The batch is cut into pieces whose product is about the
+    size of the primorial. Returns (small factors, cofactor) per value.
+    """
+    global _tree_primorial
+    mpz = int
+    if gmpy2 is not None:
+        mpz = gmpy2.mpz  # pyright: ignore[reportAttributeAccessIssue]
+    if _tree_primorial is None:
+        primes = _small_primes(_TREE_PRIME_LIMIT)
+        _tree_primorial = mpz(_product_tree(primes)[-1][0])
+    size = _tree_primorial.bit_length()
+    result = []
+    start = 0
+    while start < len(values):
+        stop, bits = start, 0
+        while stop < len(values) and bits < size:
+            bits += values[stop].bit_length()
+            stop += 1
+        chunk = values[start:stop]
+        leaves = [mpz(v) for v in chunk]
+        rems = _remainder_tree(_tree_primorial, _product_tree(leaves))
+        for n, r in zip(chunk, rems):
+            factors = []
+            for p in sorted(_small_prime_divisors(math.gcd(n, int(r)), table)):
+                while n % p == 0:
+                    factors.append(p)
+                    n //= p
+            result.append((factors, n))
+        start = stop
+    return result
+
+
+def _factor_uncached(n: int, workers: int = 1, deadline: _Deadline = None) -> tuple:
+    """Factor n from scratch and store the (prime, exponent) pairs in the cache."""
+    factors = []
+    m = n
+    try:
+        # Trial division for small factors
+        while m % 2 == 0:
+            factors.append(2)
+            m //= 2
+        for i in range(3, min(10**6, math.isqrt(m) + 1), 2):
+            if deadline is not None and i % 16384 == 1:
+                deadline.check("trial division")
+            while m % i == 0:
+                factors.append(i)
+                m //= i
+        # Split what is left with Pollard's Rho (Brent) and ECM, checking each
+        # piece
+        if m > 1:
+            _split_composite(m, factors, workers, deadline)
+    except _Interrupted as stop:
+        stop.factors = factors
+        if stop.remaining is None:
+            stop.remaining = [m]
+        raise
+    factors.sort()
+    pairs = _to_pairs(factors)
+    _cache_put(n, pairs)
+    return pairs
+
+
+def prime_factors(
+    input_number: int,
+    workers: int = None,
+    timeout: float = None,
+    token: CancellationToken = None,
+):
     """
     Factorize a number into a list of prime factors using trial + Pollard's Rho.
 
     Parameters:
         - input_number (int): The number to factorize.
+        - workers (int, optional): Processes used to run ECM curves in
+          parallel. Defaults to one (no pool).
+        - timeout (float, optional): Time budget in seconds.
+        - token (CancellationToken, optional): Token another thread can use
+          to cancel the call.
 
     Returns:
         - list: A list of prime factors.
+        - PartialFactorization: Instead, if the timeout expires or the token
+          is cancelled first: the primes found so far, the composite
+          cofactor left, and the stage that was running.
 
     Raises:
-        - InvalidInputError: If number is not a positive integer > 1.
+        - InvalidInputError: If number is not a positive integer > 1, workers
+          is not a positive integer, timeout is not a positive number, or
+          token is not a CancellationToken.
+
+    Notes:
+        - Numbers covered by the table from `build_spf_table` are factored by
+          table lookups; other results are kept in the process-wide
+          factorization cache (see `factorization_cache_info`).
+        - Cofactors above 64 bits first go through Pollard's p - 1 and
+          Williams' p + 1 (B1 = 20000, B2 = 10**6), which find factors p
+          with p - 1 or p + 1 smooth almost at once.
+        - Cofactors that Pollard's Rho does not split within a fixed budget
+          go to the elliptic-curve method (Montgomery curves, stage 1 plus a
+          baby-step/giant-step stage 2), which finds factors of 30-35 digits.
 
     Example:
         >>> prime_factors(12)
         [2, 2, 3]
+        >>> isinstance(prime_factors(2**256 + 1, timeout=0.5), PartialFactorization)
+        True
     """
     if not isinstance(input_number, int):
         raise InvalidInputError("Input must be an integer")
     if input_number <= 1:
         raise InvalidInputError("Number must be greater than 1")
-    factors = []
-    n = input_number
-    # Trial division for small factors
-    while n % 2 == 0:
-        factors.append(2)
-        n //= 2
-    for i in range(3, min(10**6, int(math.sqrt(n)) + 1), 2):
-        while n % i == 0:
-            factors.append(i)
-            n //= i
-    # If remaining is prime
-    if n > 1:
-        if is_prime(n):
+    _check_workers(workers)
+    if timeout is not None and (
+        not isinstance(timeout, (int, float))
+        or isinstance(timeout, bool)
+        or timeout <= 0
+    ):
+        raise InvalidInputError("Timeout must be a positive number")
+    if token is not None and not isinstance(token, CancellationToken):
+        raise InvalidInputError("Token must be a CancellationToken")
+    if input_number < len(_spf_table):
+        return _factor_with_table(input_number, _spf_table)
+    pairs = _cache_get(input_number)
+    if pairs is not None:
+        return _from_pairs(pairs)
+    deadline = None
+    if timeout is not None or token is not None:
+        deadline = _Deadline(timeout, token)
+    try:
+        pairs = _factor_uncached(input_number, workers or 1, deadline)
+    except _Interrupted as stop:
+        factors, cofactor = stop.factors, 1
+        for piece in stop.remaining:
+            if is_prime(piece):
+                factors.append(piece)
+            elif piece > 1:
+                cofactor *= piece
+        factors.sort()
+        if cofactor == 1:
+            return factors
+        return PartialFactorization(factors, cofactor, stop.stage)
+    return _from_pairs(pairs)
+
+
+def _batch_table(values: list) -> array:
+    """
+    Return the SPF table to use for a batch, growing it when that pays off.
+
+    The table at least doubles when it grows, so rising batch maxima do not
+    rebuild it over and over, and it is only built when the batch has about
+    sqrt(size) values for it to cover; each would otherwise cost up to
+    sqrt(n) trial divisions, against O(size) work to build the table.
+    """
+    needed = min(max(values), _SPF_BATCH_LIMIT)
+    if len(_spf_table) > needed:
+        return _spf_table
+    size = min(max(needed, 2 * len(_spf_table)), _SPF_BATCH_LIMIT)
+    covered = sum(len(_spf_table) <= n <= size for n in values)
+    if covered * math.isqrt(size) >= size:
+        return build_spf_table(size)
+    return _spf_table
+
+
+def _factor_batch(values: list) -> list:
+    """Factor a validated, non-empty batch (the body of prime_factors_many)."""
+    table = _batch_table(values)
+    result = []
+    for n in values:
+        if n < len(table):
+            result.append(_factor_with_table(n, table))
+            continue
+        pairs = _cache_get(n)
+        if pairs is None and n < _SPF_BATCH_LIMIT:
+            # Too few of these to pay for a table: trial divide each one.
+            pairs = _factor_uncached(n)
+        result.append(None if pairs is None else _from_pairs(pairs))
+    large = [i for i, factors in enumerate(result) if factors is None]
+    if not large:
+        return result
+    stripped = _strip_small_primes([values[i] for i in large], table)
+    for i, (factors, n) in zip(large, stripped):
+        # No factor below _TREE_PRIME_LIMIT is left, so n < limit**2 is prime.
+        if n >= _TREE_PRIME_LIMIT**2:
+            _split_composite(n, factors)
+            factors.sort()
+        elif n > 1:
             factors.append(n)
+        _cache_put(values[i], _to_pairs(factors))
+        result[i] = factors
+    return result
+
+
+def _factor_chunk(start: int, values: list) -> tuple:
+    """Worker task: factor one chunk of a batch; returns (start, results)."""
+    return start, _factor_batch(values)
+
+
+def _factor_parallel(values: list, workers: int, chunksize: int, ordered: bool):
+    """
+    Factor values in a process pool, yielding results as they arrive.
+
+    Values covered by this process's SPF table or cache are answered here;
+    only the rest go to the pool, and their results are cached, as on the
+    serial path. All chunks go into the pool's shared queue up front, so
+    each worker takes the next chunk as soon as it is free and a few hard
+    numbers hold up only their own chunk. Without a chunksize the chunks
+    shrink as the batch drains (guided scheduling): big chunks early for low
+    overhead, small ones at the end to balance the tail. Yields factor lists
+    in input order if ordered, else (index, factors) pairs in completion
+    order.
+    """
+    known = {}
+    pending = []
+    for i, n in enumerate(values):
+        if n < len(_spf_table):
+            known[i] = _factor_with_table(n, _spf_table)
         else:
-            # Use Pollard's Rho for large composite
-            while n > 1:
-                factor = _pollard_rho(n)
-                while n % factor == 0:
-                    factors.append(factor)
-                    n //= factor
-    return factors
+            pairs = _cache_get(n)
+            if pairs is None:
+                pending.append(i)
+            else:
+                known[i] = _from_pairs(pairs)
+    if not ordered:
+        yield from known.items()
+    bounds = []
+    start = 0
+    while start < len(pending):
+        size = chunksize or min(_MAX_CHUNK, (len(pending) - start) // (4 * workers))
+        bounds.append((start, min(len(pending), start + max(1, size))))
+        start = bounds[-1][1]
+    futures = []
+    # Not a with-block: an abandoned generator must not wait for the pool.
+    pool = ProcessPoolExecutor(workers) if pending else None
+    try:
+        for a, b in bounds:
+            chunk = [values[i] for i in pending[a:b]]
+            futures.append(pool.submit(_factor_chunk, a, chunk))
+        done = 0  # in ordered mode, values[:done] have been yielded
+        for future in futures if ordered else as_completed(futures):
+            start, results = future.result()
+            for j, factors in enumerate(results, start):
+                i = pending[j]
+                _cache_put(values[i], _to_pairs(factors))
+                if not ordered:
+                    yield i, factors
+                    continue
+                while done < i:
+                    yield known.pop(done)
+                    done += 1
+                yield factors
+                done = i + 1
+        if ordered:
+            for i in range(done, len(values)):
+                yield known.pop(i)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def prime_factors_many(
+    values: list, workers: int = None, chunksize: int = None, stream: str = None
+):
+    """
+    Factorize many numbers, sharing one smallest-prime-factor table.
+
+    Parameters:
+        - values (list): Integers > 1 to factorize.
+        - workers (int, optional): Processes to factor chunks of the batch
+          in. Defaults to one (no pool).
+        - chunksize (int, optional): Values per chunk handed to a worker.
+          Defaults to chunks that shrink as the batch drains.
+        - stream (str, optional): None returns a list; "ordered" returns an
+          iterator of factor lists in input order; "completed" returns an
+          iterator of (index, factors) pairs as chunks finish.
+
+    Returns:
+        - list: One list of prime factors per input, in input order (or an
+          iterator, see stream).
+
+    Raises:
+        - InvalidInputError: If values is not a list/tuple of integers > 1,
+          workers / chunksize are not positive integers, or stream is not
+          None, "ordered" or "completed".
+
+    Notes:
+        - Grows the shared `build_spf_table` table (geometrically, up to
+          10**7) when the batch is large enough to pay for it; otherwise
+          values past the table are trial divided one by one.
+        - Larger values have all prime factors below 2**20 removed together
+          with a product tree and a remainder tree (Bernstein), instead of
+          one trial division per value; only the cofactors left go on to
+          Pollard's Rho and ECM.
+        - With workers > 1, idle workers pick up the next chunk from the
+          pool's queue, so a few hard numbers do not leave the others idle.
+
+    Example:
+        >>> prime_factors_many([12, 35, 97])
+        [[2, 2, 3], [5, 7], [97]]
+        >>> sorted(prime_factors_many([12, 35], workers=2, stream="completed"))
+        [(0, [2, 2, 3]), (1, [5, 7])]
+    """
+    if not isinstance(values, (list, tuple)):
+        raise InvalidInputError("Input must be a list or tuple")
+    for n in values:
+        if not isinstance(n, int):
+            raise InvalidInputError("All elements must be integers")
+        if n <= 1:
+            raise InvalidInputError("Numbers must be greater than 1")
+    _check_workers(workers)
+    if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+        raise InvalidInputError("Chunk size must be a positive integer")
+    if stream not in (None, "ordered", "completed"):
+        raise InvalidInputError('Stream must be None, "ordered" or "completed"')
+    if not values:
+        return [] if stream is None else iter(())
+    if workers and workers > 1:
+        ordered = stream != "completed"
+        results = _factor_parallel(list(values), workers, chunksize, ordered)
+        return list(results) if stream is None else results
+    results = _factor_batch(values)
+    if stream == "completed":
+        return iter(enumerate(results))
+    return results if stream is None else iter(results)
+
+
+def factorization(input_number: int) -> tuple:
+    """
+    Return the prime factorization of a number as (prime, exponent) pairs.
+
+    Parameters:
+        - input_number (int): The number to factorize.
+
+    Returns:
+        - tuple: ((prime, exponent), ...) in increasing order of prime.
+
+    Raises:
+        - InvalidInputError: If number is not a positive integer > 1.
+
+    Notes:
+        - Served from the process-wide factorization cache when possible,
+          so repeated calls for the same number (from divisor, sigma and
+          GCD functions) factor it only once.
+
+    Example:
+        >>> factorization(360)
+        ((2, 3), (3, 2), (5, 1))
+    """
+    if not isinstance(input_number, int):
+        raise InvalidInputError("Input must be an integer")
+    if input_number <= 1:
+        raise InvalidInputError("Number must be greater than 1")
+    if input_number < len(_spf_table):
+        return _to_pairs(_factor_with_table(input_number, _spf_table))
+    pairs = _cache_get(input_number)
+    if pairs is None:
+        pairs = _factor_uncached(input_number)
+    return pairs
+
+
+def factorization_cache_info() -> dict:
+    """
+    Return statistics of the process-wide factorization cache.
+
+    Returns:
+        - dict: hits, misses, evictions, entries, bytes (approximate memory
+          charged to the entries) and max_bytes (the budget).
+
+    Example:
+        >>> sorted(factorization_cache_info())
+        ['bytes', 'entries', 'evictions', 'hits', 'max_bytes', 'misses']
+    """
+    with _factor_cache_lock:
+        return dict(_factor_cache_stats, entries=len(_factor_cache))
+
+
+def set_factorization_cache_size(max_bytes: int) -> None:
+    """
+    Set the byte budget of the factorization cache, evicting as needed.
+
+    Parameters:
+        - max_bytes (int): The new budget; 0 disables caching.
+
+    Raises:
+        - InvalidInputError: If max_bytes is not a non-negative integer.
+
+    Example:
+        >>> set_factorization_cache_size(1 << 20)
+    """
+    if not isinstance(max_bytes, int) or max_bytes < 0:
+        raise InvalidInputError("Cache size must be a non-negative integer")
+    stats = _factor_cache_stats
+    with _factor_cache_lock:
+        stats["max_bytes"] = max_bytes
+        while stats["bytes"] > max_bytes:
+            _, (_, freed) = _factor_cache.popitem(last=False)
+            stats["bytes"] -= freed
+            stats["evictions"] += 1
+
+
+def clear_factorization_cache() -> None:
+    """
+    Empty the factorization cache and reset its statistics.
+
+    Example:
+        >>> clear_factorization_cache()
+    """
+    with _factor_cache_lock:
+        _factor_cache.clear()
+        _factor_cache_stats.update(hits=0, misses=0, evictions=0, bytes=0)
+
+
+def siqs_factor(
+    input_number: int, factor_base_size: int = None, workers: int = None
+) -> int:
+    """
+    Find a non-trivial factor of a composite with the self-initializing
+    quadratic sieve (SIQS).
+
+    Parameters:
+        - input_number (int): The composite number to split.
+        - factor_base_size (int, optional): Number of primes in the factor
+          base. Defaults to a size chosen from the number of digits.
+        - workers (int, optional): Processes used for sieving. Defaults to
+          one (no pool).
+
+    Returns:
+        - int: A factor d of input_number with 1 < d < input_number.
+
+    Raises:
+        - InvalidInputError: If number is not an integer > 1, or
+          factor_base_size / workers are not positive integers.
+        - MathError: If number is prime.
+
+    Notes:
+        - Suited to balanced semiprimes of about 40-80 digits, which defeat
+          Pollard's Rho and ECM. `prime_factors` calls it automatically for
+          composites up to 100 digits.
+        - Sieve arrays use NumPy when it is installed; without it the sieve
+          runs in pure Python, several times slower.
+        - Relations include single large primes; dependencies are found by
+          Gaussian elimination over GF(2) on rows packed into integers.
+
+    Example:
+        >>> siqs_factor(1000000016000000063) in (1000000007, 1000000009)
+        True
+    """
+    if not isinstance(input_number, int):
+        raise InvalidInputError("Input must be an integer")
+    if input_number <= 1:
+        raise InvalidInputError("Number must be greater than 1")
+    if factor_base_size is not None and (
+        not isinstance(factor_base_size, int) or factor_base_size < 1
+    ):
+        raise InvalidInputError("Factor base size must be a positive integer")
+    _check_workers(workers)
+    n = input_number
+    if is_prime(n):
+        raise MathError("Number is prime")
+    if n % 2 == 0:
+        return 2
+    root, k = _perfect_power(n)
+    if k > 1:
+        return root
+    if n.bit_length() <= 64:
+        return _pollard_brent(n)
+    return _siqs(n, factor_base_size, workers or 1)
+
+
+def _greatest_prime_of_gcd(numbers) -> int:
+    """Largest prime dividing gcd(numbers), stopping as soon as it hits 1."""
+    if gmpy2 is not None:
+        gcd = gmpy2.gcd  # pyright: ignore[reportAttributeAccessIssue]
+    else:
+        gcd = math.gcd
+    g = numbers[0]
+    for n in numbers[1:]:
+        g = gcd(g, n)
+        if g == 1:
+            raise MathError("No common prime divisor")
+    return prime_factors(int(g))[-1]
 
 
 def greatest_common_prime_divisor(number1: int, number2: int) -> int:
@@ -99,6 +1580,10 @@ def greatest_common_prime_divisor(number1: int, number2: int) -> int:
         - InvalidInputError: If numbers are not positive integers > 1.
         - MathError: If no common prime divisor exists.
 
+    Notes:
+        - Only gcd(number1, number2) is factorized, so coprime inputs are
+          answered by a single gcd without factoring either number.
+
     Example:
         >>> greatest_common_prime_divisor(12, 18)
         3
@@ -107,9 +1592,39 @@ def greatest_common_prime_divisor(number1: int, number2: int) -> int:
         raise InvalidInputError("Both numbers must be integers")
     if number1 <= 1 or number2 <= 1:
         raise InvalidInputError("Numbers must be greater than 1")
-    factors1 = set(prime_factors(number1))
-    factors2 = set(prime_factors(number2))
-    common_factors = factors1.intersection(factors2)
-    if not common_factors:
-        raise MathError("No common prime divisor")
-    return max(common_factors)
+    return _greatest_prime_of_gcd((number1, number2))
+
+
+def greatest_common_prime_divisor_many(numbers: list) -> int:
+    """
+    Find the greatest prime dividing every number in a list.
+
+    Parameters:
+        - numbers (list): At least two integers > 1.
+
+    Returns:
+        - int: The greatest prime dividing all of numbers.
+
+    Raises:
+        - InvalidInputError: If numbers is not a list/tuple of at least two
+          integers > 1.
+        - MathError: If no common prime divisor exists.
+
+    Notes:
+        - Folds the gcd across the list, stopping early once it reaches 1,
+          and factorizes only the final gcd.
+
+    Example:
+        >>> greatest_common_prime_divisor_many([84, 126, 210])
+        7
+    """
+    if not isinstance(numbers, (list, tuple)):
+        raise InvalidInputError("Input must be a list or tuple")
+    if len(numbers) < 2:
+        raise InvalidInputError("List must have at least 2 elements")
+    for n in numbers:
+        if not isinstance(n, int):
+            raise InvalidInputError("All elements must be integers")
+        if n <= 1:
+            raise InvalidInputError("Numbers must be greater than 1")
+    return _greatest_prime_of_gcd(numbers)
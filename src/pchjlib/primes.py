@@ -5,7 +5,16 @@ Functions for prime and emirp numbers.
 """
 
 import math
-from pchjlib.utils import InvalidInputError
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from multiprocessing import shared_memory
+
+from pchjlib.utils import InvalidInputError, MathError, OutOfRangeError
 
 # Optional import for gmpy2 to handle large numbers
 
@@ -19,22 +28,37 @@ except ImportError:
 
     GMPY2_AVAILABLE = False
 
+# Optional import for numpy to vectorize batch operations
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+
+    NUMPY_AVAILABLE = False
+
 
 def _quick_checks(n: int) -> int:
     """
     Perform quick checks before running Miller - Rabin.
 
+    n below 2**20 is answered from a lazily built wheel-30 bitmap; larger n
+    is rejected by one gcd against the product of the primes below 2048 or
+    by perfect square elimination, so most composites never reach pow().
+
     Returns:
         0  -> definitely composite
         1  -> definitely prime
        -1  -> inconclusive, continue with Miller - Rabin
     """
-    if n < 2:
+    if n < _SMALL_PRIME_LIMIT:
+        if n < 7:
+            return 1 if n in (2, 3, 5) else 0
+        return 1 if _small_prime_table()[n // 30] & _WHEEL_MASK[n % 30] else 0
+    if math.gcd(n, _QUICK_PRIMORIAL) != 1:
         return 0
-    if n % 2 == 0:
-        return 1 if n == 2 else 0
-    if n % 3 == 0:
-        return 1 if n == 3 else 0
     r = g_isqrt(n)
     if r * r == n:
         return 0
@@ -70,6 +94,70 @@ def _miller_rabin(n: int, bases: tuple[int, ...]) -> bool:
     return True
 
 
+def _jacobi(a: int, n: int) -> int:
+    """
+    Jacobi symbol (a / n) for odd n > 0.
+    """
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas(n: int) -> bool:
+    """
+    Strong Lucas probable-prime test with Selfridge's parameters.
+
+    Args:
+        n (int): Odd number > 3 that is not a perfect square.
+
+    Returns:
+        bool: True if n is a strong Lucas probable prime, False if composite.
+    """
+    # Selfridge method A: first D in 5, -7, 9, -11, ... with (D / n) = -1.
+    d_param = 5
+    while True:
+        j = _jacobi(d_param, n)
+        if j == -1:
+            break
+        if j == 0 and abs(d_param) != n:
+            return False
+        d_param = -d_param - 2 if d_param > 0 else -d_param + 2
+    q = (1 - d_param) // 4  # P = 1
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    u, v, qk = 1, 1, q % n  # U_1, V_1, Q^1
+    for bit in bin(d)[3:]:
+        u = u * v % n
+        v = (v * v - 2 * qk) % n
+        qk = qk * qk % n
+        if bit == "1":
+            u, v = u + v, d_param * u + v
+            u = (u + n if u & 1 else u) >> 1
+            v = (v + n if v & 1 else v) >> 1
+            u %= n
+            v %= n
+            qk = qk * q % n
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v = (v * v - 2 * qk) % n
+        qk = qk * qk % n
+        if v == 0:
+            return True
+    return False
+
+
 def is_prime(n: int) -> bool:
     """
     Determine whether a number is prime.
@@ -85,10 +173,15 @@ def is_prime(n: int) -> bool:
 
     Notes:
         - Negative numbers, 0, and 1 always return False.
-        - Uses quick trial division by small primes and perfect square elimination.
+        - n < 2**20 is looked up in a precomputed bitmap; larger n is trial
+          divided by the primes below 2048 through a single gcd and checked
+          for being a perfect square.
         - Falls back on a deterministic Miller - Rabin test with bases chosen
-          according to n's bit length.
-        - If gmpy2 is installed, powmod and isqrt are accelerated.
+          according to n's bit length for n < 2**64.
+        - Above 2**64 uses Baillie - PSW (strong base-2 Miller - Rabin plus a
+          strong Lucas test), which has no known counterexample.
+        - If gmpy2 is installed, powmod and isqrt are accelerated and BPSW
+          runs through gmpy2.is_strong_bpsw_prp.
 
     Examples:
         >>> is_prime(7)
@@ -106,31 +199,207 @@ def is_prime(n: int) -> bool:
     if t != -1:
         return t == 1
 
+    return _is_probable_prime(n)
+
+
+def _is_probable_prime(n: int) -> bool:
+    """
+    Run the probabilistic stage of is_prime on an odd non-square n > 3.
+
+    Below 2**64 a deterministic Miller - Rabin base set is used; above it,
+    Baillie - PSW (strong base-2 test plus strong Lucas test).
+    """
     bl = n.bit_length()
     if bl <= 32:
-        bases = (2, 7, 61)
-    elif bl <= 64:
-        bases = (2, 3, 5, 7, 11, 13, 17)
-    elif bl <= 128:
-        bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
-    else:
-        bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+        return _miller_rabin(n, (2, 7, 61))
+    if bl <= 64:
+        # Sinclair's base set, deterministic for every n < 2**64.
+        return _miller_rabin(n, (2, 325, 9375, 28178, 450775, 9780504, 1795265022))
+    if GMPY2_AVAILABLE:
+        return bool(gmpy2.is_strong_bpsw_prp(n))  # type: ignore[attr-defined]
+    return _miller_rabin(n, (2,)) and _strong_lucas(n)
+
+
+# Odd numbers covered by one sieve segment (one byte each); 256 KiB keeps a
+# segment resident in L2 cache while it is being crossed off.
+_SEGMENT_SIZE = 1 << 18
+# Windows high up need millions of base primes, and each one costs a Python
+# iteration per segment; segments grow with the base up to this size.
+_MAX_SEGMENT_SIZE = 1 << 24
+# Above this sqrt(hi) the base primes are produced by the segmented sieve
+# itself and stored in a compact array instead of one flat sieve.
+_FLAT_BASE_LIMIT = 1 << 24
+
+
+def _small_primes(limit: int) -> list:
+    """
+    Return every prime <= limit using a plain odd-only sieve.
+
+    Used to seed the segmented sieve with base primes up to sqrt(limit).
+    """
+    if limit < 2:
+        return []
+    size = (limit + 1) // 2  # index i stands for 2 * i + 1
+    sieve = bytearray([1]) * size
+    sieve[0] = 0
+    for i in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+        if sieve[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            sieve[start::p] = bytes((size - 1 - start) // p + 1)
+    return [2] + list(compress(range(1, 2 * size, 2), sieve))
+
+
+def _base_primes(hi: int):
+    """
+    Return the odd primes up to sqrt(hi), as an array('I') when there are many.
+    """
+    root = math.isqrt(hi)
+    if root <= _FLAT_BASE_LIMIT:
+        return _small_primes(root)[1:]
+    return array("I", _iter_primes(3, root))
+
+
+def _segment_size(base_primes) -> int:
+    """Pick a segment size that amortizes the per-base-prime loop."""
+    return max(_SEGMENT_SIZE, min(8 * len(base_primes), _MAX_SEGMENT_SIZE))
+
+
+def _odd_segments(lo: int, hi: int, base_primes, size: int = _SEGMENT_SIZE):
+    """
+    Sieve the odd numbers of [lo, hi] one segment at a time.
+
+    Args:
+        lo (int): Lower bound (inclusive), lo >= 1.
+        hi (int): Upper bound (inclusive).
+        base_primes: Ascending odd primes covering at least sqrt(hi).
+        size (int): Odd numbers per segment.
+
+    Yields:
+        tuple[int, bytearray]: (first, flags) where flags[i] is 1 exactly when
+        first + 2 * i is prime.
+    """
+    first = lo | 1
+    while first <= hi:
+        last = min(hi, first + 2 * (size - 1))
+        count = (last - first) // 2 + 1
+        flags = bytearray([1]) * count
+        for p in base_primes:
+            square = p * p
+            if square > last:
+                break
+            start = max(square, -(-first // p) * p)
+            if not start & 1:
+                start += p
+            index = (start - first) // 2
+            if index < count:
+                flags[index::p] = bytes((count - 1 - index) // p + 1)
+        if first == 1:
+            flags[0] = 0
+        yield first, flags
+        first = last + 2
+
+
+def _iter_primes(lo: int, hi: int):
+    if lo <= 2 <= hi:
+        yield 2
+    if hi < 3:
+        return
+    lo = max(lo, 3)
+    if hi - lo < math.isqrt(hi) >> 4:
+        # Window too narrow to pay for the base primes: test each odd number.
+        for n in range(lo | 1, hi + 1, 2):
+            t = _quick_checks(n)
+            if t == 1 or (t == -1 and _is_probable_prime(n)):
+                yield n
+        return
+    base_primes = _base_primes(hi)
+    size = _segment_size(base_primes)
+    for first, flags in _odd_segments(lo, hi, base_primes, size):
+        yield from compress(range(first, first + 2 * len(flags), 2), flags)
+
+
+def iter_primes(lo: int, hi: int):
+    """
+    Lazily yield the primes in [lo, hi] using a segmented sieve.
+
+    Parameters:
+        - lo (int): The lower bound (inclusive).
+        - hi (int): The upper bound (inclusive).
+
+    Returns:
+        - generator: Primes in increasing order.
+
+    Raises:
+        - InvalidInputError: If lo or hi is not an integer.
+
+    Notes:
+        - Only odd numbers are sieved, one cache-sized bytearray segment at a
+          time, so memory stays proportional to sqrt(hi) plus one segment.
+
+    Example:
+        >>> list(iter_primes(10, 30))
+        [11, 13, 17, 19, 23, 29]
+    """
+    if not (isinstance(lo, int) and isinstance(hi, int)):
+        raise InvalidInputError("Bounds must be integers")
+    return _iter_primes(max(lo, 0), hi)
+
 
-    return _miller_rabin(n, bases)
+def primes_in_range(lo: int, hi: int) -> array:
+    """
+    Return the primes in [lo, hi] as a compact array, sieving only the window.
+
+    Parameters:
+        - lo (int): The lower bound (inclusive).
+        - hi (int): The upper bound (inclusive), below 2**64.
+
+    Returns:
+        - array.array: Primes in increasing order (typecode 'Q').
+
+    Raises:
+        - InvalidInputError: If lo or hi is not an integer.
+        - OutOfRangeError: If hi >= 2**64.
+
+    Notes:
+        - Crosses off multiples of the base primes up to sqrt(hi) inside the
+          window only, so a dense window near 10**15 or 10**18 costs a
+          base-prime sieve plus the window, not a test per integer.
+        - Windows much narrower than sqrt(hi) test each odd number instead,
+          since there generating the base primes would dominate.
+
+    Example:
+        >>> list(primes_in_range(10**12, 10**12 + 100))
+        [1000000000039, 1000000000061, 1000000000063, 1000000000091]
+    """
+    if not (isinstance(lo, int) and isinstance(hi, int)):
+        raise InvalidInputError("Bounds must be integers")
+    if hi >= 1 << 64:
+        raise OutOfRangeError("Upper bound must be < 2**64")
+    return array("Q", _iter_primes(max(lo, 0), hi))
 
 
-def generate_prime_list(limit: int) -> list:
+def generate_prime_list(limit: int, workers=None) -> list:
     """
     Generate a list of prime numbers from 0 to limit using the Sieve algorithm.
 
     Parameters:
         - limit (int): The upper limit of the list.
+        - workers (int | None): If > 1, sieve across that many processes.
 
     Returns:
         - list: A list of prime numbers.
 
     Raises:
-        - InvalidInputError: If limit is not an integer >= 2.
+        - InvalidInputError: If limit is not an integer >= 2, or workers is
+          not a positive integer.
+
+    Notes:
+        - Backed by the segmented sieve of `iter_primes`, so the only large
+          allocation is the returned list itself.
+        - With workers > 1 the range is split into segments that worker
+          processes sieve into one shared-memory wheel-30 bitmap, which is
+          then decoded here; no prime lists are pickled.
 
     Example:
         >>> generate_prime_list(10)
@@ -140,13 +409,797 @@ def generate_prime_list(limit: int) -> list:
         raise InvalidInputError("Limit must be an integer")
     if limit < 2:
         raise InvalidInputError("Limit must be >= 2")
-    sieve = [True] * (limit + 1)
-    sieve[0] = sieve[1] = False
-    for i in range(2, int(math.sqrt(limit)) + 1):
-        if sieve[i]:
-            for j in range(i * i, limit + 1, i):
-                sieve[j] = False
-    return [i for i in range(limit + 1) if sieve[i]]
+    _check_workers(workers)
+    if workers and workers > 1:
+        return list(PrimeSieve(limit, workers=workers)._iter_table(2, limit))
+    return list(_iter_primes(2, limit))
+
+
+# Wheel-30 table layout: byte k covers [30k, 30k + 30) and bit j marks
+# 30k + _WHEEL[j], the only residues that can be prime beyond 2, 3 and 5.
+_WHEEL = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL_INVERSE = {r: next(i for i in _WHEEL if r * i % 30 == 1) for r in _WHEEL}
+_WHEEL_MASK = bytes(1 << _WHEEL.index(r) if r in _WHEEL else 0 for r in range(30))
+_WHEEL_UPTO = bytes(
+    sum(1 << j for j, w in enumerate(_WHEEL) if w <= r) for r in range(30)
+)
+_WHEEL_FROM = bytes(
+    sum(1 << j for j, w in enumerate(_WHEEL) if w >= r) for r in range(30)
+)
+_WHEEL_OFFSETS = tuple(
+    tuple(w for j, w in enumerate(_WHEEL) if b >> j & 1) for b in range(256)
+)
+_POPCOUNT = bytes(bin(b).count("1") for b in range(256))
+
+# Table bytes per prefix-count block used by PrimeSieve rank/select queries.
+_BLOCK_SIZE = 256
+
+# On-disk PrimeSieve tables: a versioned header, then the wheel-30 bits and the
+# block counts (little-endian uint64), each aligned for mmap on every platform.
+_FILE_MAGIC = b"PCHJPRIM"
+_FILE_VERSION = 1
+_FILE_ALIGN = 1 << 16
+# magic, version, block size, table bytes, bits offset, counts offset, counts
+_FILE_HEADER = struct.Struct("<8sIIQQQQ")
+
+
+def _wheel_segment(lo: int, hi: int, base_primes: list) -> bytearray:
+    """
+    Sieve wheel-30 table bytes lo .. hi - 1.
+
+    Args:
+        lo (int): First table byte (covers 30 * lo .. 30 * lo + 29).
+        hi (int): One past the last table byte.
+        base_primes (list): Ascending primes >= 7 covering sqrt(30 * hi).
+
+    Returns:
+        bytearray: The bit-packed segment.
+    """
+    size = hi - lo
+    packed = 0
+    for j, r in enumerate(_WHEEL):
+        plane = bytearray([1]) * size
+        first = 30 * lo + r
+        last = 30 * (hi - 1) + r
+        for p in base_primes:
+            square = p * p
+            if square > last:
+                break
+            # Smallest multiple of p that is congruent to r mod 30 and not
+            # below max(p * p, first); successive ones are 30 * p apart.
+            step = 30 * p
+            n = p * (r * _WHEEL_INVERSE[p % 30] % 30)
+            start = max(square, first)
+            if n < start:
+                n += -(-(start - n) // step) * step
+            index = (n - r) // 30 - lo
+            if index < size:
+                plane[index::p] = bytes((size - 1 - index) // p + 1)
+        packed |= int.from_bytes(plane, "little") << j
+    segment = bytearray(packed.to_bytes(size, "little"))
+    if lo == 0:
+        segment[0] &= 0xFE  # 1 is not prime
+    return segment
+
+
+def _wheel_table(lo: int, hi: int) -> bytearray:
+    """Sieve wheel-30 table bytes lo .. hi - 1 in cache-sized segments."""
+    base_primes = _small_primes(math.isqrt(30 * hi))[3:]
+    table = bytearray()
+    for start in range(lo, hi, _SEGMENT_SIZE):
+        table += _wheel_segment(start, min(hi, start + _SEGMENT_SIZE), base_primes)
+    return table
+
+
+def _fill_shared_table(name: str, lo: int, hi: int, offset: int) -> None:
+    """Worker: sieve table bytes lo .. hi - 1 into shared memory at lo - offset."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        shm.buf[lo - offset : hi - offset] = _wheel_table(lo, hi)
+    finally:
+        shm.close()
+
+
+def _parallel_wheel_table(lo: int, hi: int, workers: int) -> bytearray:
+    """
+    Sieve wheel-30 table bytes lo .. hi - 1 across a process pool.
+
+    Each worker sieves its own chunk straight into one shared-memory buffer,
+    so only (name, bounds) tuples cross process boundaries.
+    """
+    size = hi - lo
+    # A few chunks per worker evens out uneven progress without paying
+    # the base-prime setup too often.
+    chunk = max(_SEGMENT_SIZE, -(-size // (4 * workers)))
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _fill_shared_table, shm.name, start, min(hi, start + chunk), lo
+                )
+                for start in range(lo, hi, chunk)
+            ]
+            for future in futures:
+                future.result()
+        return bytearray(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _check_workers(workers) -> None:
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise InvalidInputError("Workers must be a positive integer")
+
+
+def _next_prime(n: int) -> int:
+    """Smallest prime > n by testing candidates one by one (n >= 5)."""
+    m = n + 1 + (n & 1)  # first odd number above n
+    while not is_prime(m):
+        m += 2
+    return m
+
+
+# Queries grow a PrimeSieve on demand only up to this bound (about 36 MB of
+# table); past it they fall back to the module-level functions.
+_SIEVE_GROWTH_LIMIT = 1 << 30
+
+
+class PrimeSieve:
+    """
+    Reusable prime table that grows on demand.
+
+    The table is bit-packed on a mod-30 wheel (8 bits per 30 integers) and
+    keeps running prime counts per block, so repeated queries against the
+    same range are answered from memory instead of being recomputed.
+    Queries grow the table up to 2**30 at most; larger arguments are
+    answered by `is_prime`, `prime_count`, `nth_prime` and `iter_primes`
+    without touching the table.
+
+    Parameters:
+        - limit (int): Initial upper bound of the table (default 10**6).
+        - workers (int | None): Processes used to build (and later grow) the
+          table; None or 1 sieves in this process.
+
+    Raises:
+        - InvalidInputError: If limit is not an integer or workers is not a
+          positive integer.
+
+    Example:
+        >>> sieve = PrimeSieve(100)
+        >>> sieve.count_primes(100), sieve.nth_prime(10), sieve.next_prime(100)
+        (25, 29, 101)
+    """
+
+    def __init__(self, limit: int = 10**6, workers=None):
+        if not isinstance(limit, int):
+            raise InvalidInputError("Limit must be an integer")
+        _check_workers(workers)
+        self._workers = workers or 1
+        self._maps = ()
+        self._bits = bytearray()
+        self._counts = array("Q", [0])  # primes > 5 in bytes [0, k * block)
+        self._extend(max(limit, 30))
+
+    @property
+    def limit(self) -> int:
+        """Largest integer currently covered by the table."""
+        return 30 * len(self._bits) - 1
+
+    def _extend(self, limit: int) -> None:
+        """Grow the table to cover at least limit (doubling up to the cap)."""
+        old = len(self._bits)
+        new = limit // 30 + 1
+        if new <= old:
+            return
+        if self._maps:
+            raise OutOfRangeError(
+                f"Mapped prime table only covers numbers <= {self.limit}"
+            )
+        new = max(new, min(2 * old, _SIEVE_GROWTH_LIMIT // 30 + 1))
+        if self._workers > 1 and new - old > _SEGMENT_SIZE:
+            self._bits += _parallel_wheel_table(old, new, self._workers)
+        else:
+            self._bits += _wheel_table(old, new)
+        counts = self._counts
+        total = counts[-1]
+        start = (len(counts) - 1) * _BLOCK_SIZE
+        ranks = self._bits[start:].translate(_POPCOUNT)
+        for i in range(0, len(ranks) - _BLOCK_SIZE + 1, _BLOCK_SIZE):
+            total += sum(ranks[i : i + _BLOCK_SIZE])
+            counts.append(total)
+
+    def _covers(self, x: int) -> bool:
+        """Grow the table to x if allowed; False when x is past the cap."""
+        if x > self.limit:
+            if x > _SIEVE_GROWTH_LIMIT:
+                return False
+            self._extend(x)
+        return True
+
+    def _rank(self, x: int) -> int:
+        """Count table primes (> 5) that are <= x, for 0 <= x <= limit."""
+        q, r = divmod(x, 30)
+        block = q // _BLOCK_SIZE
+        return (
+            self._counts[block]
+            + sum(self._bits[block * _BLOCK_SIZE : q].translate(_POPCOUNT))
+            + _POPCOUNT[self._bits[q] & _WHEEL_UPTO[r]]
+        )
+
+    def is_prime(self, n: int) -> bool:
+        """
+        Check whether n is prime by table lookup, growing the table if needed.
+
+        Example:
+            >>> PrimeSieve(100).is_prime(97)
+            True
+        """
+        if not isinstance(n, int):
+            raise InvalidInputError("Number must be an integer")
+        if n < 7:
+            return n in (2, 3, 5)
+        if not self._covers(n):
+            return is_prime(n)
+        return bool(self._bits[n // 30] & _WHEEL_MASK[n % 30])
+
+    __contains__ = is_prime
+
+    def count_primes(self, x: int) -> int:
+        """
+        Count the primes <= x (the prime-counting function pi(x)).
+
+        Example:
+            >>> PrimeSieve().count_primes(10**6)
+            78498
+        """
+        if not isinstance(x, int):
+            raise InvalidInputError("Number must be an integer")
+        if x < 7:
+            return (x >= 2) + (x >= 3) + (x >= 5)
+        if not self._covers(x):
+            return prime_count(x)
+        return 3 + self._rank(x)
+
+    def nth_prime(self, k: int) -> int:
+        """
+        Return the k-th prime (1-based), growing the table if needed.
+
+        Raises:
+            - InvalidInputError: If k is not a positive integer.
+
+        Example:
+            >>> PrimeSieve().nth_prime(1000)
+            7919
+        """
+        if not isinstance(k, int):
+            raise InvalidInputError("Index must be an integer")
+        if k < 1:
+            raise InvalidInputError("Index must be >= 1")
+        if k <= 3:
+            return (2, 3, 5)[k - 1]
+        k -= 3
+        while self._rank(self.limit) < k:
+            bound = _nth_prime_upper_bound(k + 3)
+            if not self._covers(max(bound, min(2 * self.limit, _SIEVE_GROWTH_LIMIT))):
+                return nth_prime(k + 3)
+        block = bisect_right(self._counts, k - 1) - 1
+        seen = self._counts[block]
+        index = block * _BLOCK_SIZE
+        while True:
+            byte = self._bits[index]
+            if seen + _POPCOUNT[byte] >= k:
+                return 30 * index + _WHEEL_OFFSETS[byte][k - seen - 1]
+            seen += _POPCOUNT[byte]
+            index += 1
+
+    def next_prime(self, n: int) -> int:
+        """
+        Return the smallest prime strictly greater than n.
+
+        Example:
+            >>> PrimeSieve(100).next_prime(13)
+            17
+        """
+        if not isinstance(n, int):
+            raise InvalidInputError("Number must be an integer")
+        if n < 5:
+            return 2 if n < 2 else (3 if n < 3 else 5)
+        index, r = divmod(n + 1, 30)
+        if not self._covers(30 * index + 29):
+            return _next_prime(n)
+        byte = self._bits[index] & _WHEEL_FROM[r]
+        while not byte:
+            index += 1
+            if not self._covers(30 * index + 29):
+                return _next_prime(30 * index - 1)
+            byte = self._bits[index]
+        return 30 * index + _WHEEL[(byte & -byte).bit_length() - 1]
+
+    def prev_prime(self, n: int) -> int:
+        """
+        Return the largest prime strictly less than n.
+
+        Raises:
+            - MathError: If n <= 2 (there is no smaller prime).
+
+        Example:
+            >>> PrimeSieve(100).prev_prime(13)
+            11
+        """
+        if not isinstance(n, int):
+            raise InvalidInputError("Number must be an integer")
+        if n <= 2:
+            raise MathError("No prime below 2")
+        if n <= 7:
+            return 2 if n == 3 else (3 if n <= 5 else 5)
+        if not self._covers(n - 1):
+            m = n - 1
+            while m > self.limit:
+                if is_prime(m):
+                    return m
+                m -= 1
+            n = m + 1
+        index, r = divmod(n - 1, 30)
+        byte = self._bits[index] & _WHEEL_UPTO[r]
+        while not byte:
+            index -= 1
+            if index < 0:
+                return 5
+            byte = self._bits[index]
+        return 30 * index + _WHEEL[byte.bit_length() - 1]
+
+    def primes(self, lo: int, hi: int):
+        """
+        Yield the primes in [lo, hi] straight from the table.
+
+        Example:
+            >>> list(PrimeSieve(100).primes(10, 30))
+            [11, 13, 17, 19, 23, 29]
+        """
+        if not (isinstance(lo, int) and isinstance(hi, int)):
+            raise InvalidInputError("Bounds must be integers")
+        if not self._covers(hi):
+            return _iter_primes(max(lo, 0), hi)
+        return self._iter_table(lo, hi)
+
+    def _iter_table(self, lo: int, hi: int):
+        for p in (2, 3, 5):
+            if lo <= p <= hi:
+                yield p
+        lo = max(lo, 7)
+        bits = self._bits
+        for index in range(lo // 30, hi // 30 + 1):
+            byte = bits[index]
+            if byte:
+                base = 30 * index
+                for offset in _WHEEL_OFFSETS[byte]:
+                    if lo <= base + offset <= hi:
+                        yield base + offset
+
+    def save(self, path) -> None:
+        """
+        Write the table to a binary file that `PrimeSieve.open` can map.
+
+        Example:
+            >>> PrimeSieve(10**6).save("primes.bin")  # doctest: +SKIP
+        """
+        size = len(self._bits)
+        counts_offset = _FILE_ALIGN + -(-size // _FILE_ALIGN) * _FILE_ALIGN
+        counts = array("Q", self._counts)
+        if sys.byteorder == "big":
+            counts.byteswap()
+        header = _FILE_HEADER.pack(
+            _FILE_MAGIC,
+            _FILE_VERSION,
+            _BLOCK_SIZE,
+            size,
+            _FILE_ALIGN,
+            counts_offset,
+            len(counts),
+        )
+        with open(path, "wb") as file:
+            file.write(header)
+            file.seek(_FILE_ALIGN)
+            file.write(self._bits)
+            file.seek(counts_offset)
+            file.write(counts.tobytes())
+
+    @classmethod
+    def open(cls, path) -> "PrimeSieve":
+        """
+        Map a table written by `save` read-only, without sieving anything.
+
+        Lookups, counts and iteration read straight from the page cache, so
+        many processes can share one table. The mapped table cannot grow:
+        queries beyond its limit raise OutOfRangeError.
+
+        Raises:
+            - InvalidInputError: If the file is not a supported prime table.
+
+        Example:
+            >>> with PrimeSieve.open("primes.bin") as sieve:  # doctest: +SKIP
+            ...     sieve.count_primes(10**6)
+            78498
+        """
+        with open(path, "rb") as file:
+            header = file.read(_FILE_HEADER.size)
+            if len(header) < _FILE_HEADER.size or header[:8] != _FILE_MAGIC:
+                raise InvalidInputError("Not a pchjlib prime table")
+            _, version, block, size, bits_offset, counts_offset, count = (
+                _FILE_HEADER.unpack(header)
+            )
+            if version != _FILE_VERSION or block != _BLOCK_SIZE:
+                raise InvalidInputError("Unsupported prime table version")
+            bits = mmap.mmap(
+                file.fileno(), size, offset=bits_offset, access=mmap.ACCESS_READ
+            )
+            counts_map = mmap.mmap(
+                file.fileno(), 8 * count, offset=counts_offset, access=mmap.ACCESS_READ
+            )
+        sieve = cls.__new__(cls)
+        sieve._workers = 1
+        sieve._maps = (bits, counts_map)
+        sieve._bits = bits
+        if sys.byteorder == "big":
+            counts = array("Q", counts_map)
+            counts.byteswap()
+            sieve._counts = counts
+        else:
+            sieve._counts = memoryview(counts_map).cast("Q")
+        return sieve
+
+    def close(self) -> None:
+        """Release the file mapping of a table opened with `open`."""
+        if self._maps:
+            if isinstance(self._counts, memoryview):
+                self._counts.release()
+            for view in self._maps:
+                view.close()
+            self._maps = ()
+
+    def __enter__(self) -> "PrimeSieve":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def build_prime_table(path, limit: int, workers=None) -> None:
+    """
+    Sieve up to limit and write the table to path for `open_prime_table`.
+
+    Parameters:
+        - path (str | os.PathLike): Destination file.
+        - limit (int): Upper bound of the table.
+        - workers (int | None): Processes used for sieving.
+
+    Raises:
+        - InvalidInputError: If limit is not an integer or workers is invalid.
+
+    Example:
+        >>> build_prime_table("primes.bin", 10**6)  # doctest: +SKIP
+    """
+    PrimeSieve(limit, workers=workers).save(path)
+
+
+def open_prime_table(path) -> PrimeSieve:
+    """
+    Memory-map a table written by `build_prime_table` (see `PrimeSieve.open`).
+
+    Parameters:
+        - path (str | os.PathLike): Table file.
+
+    Returns:
+        - PrimeSieve: A read-only sieve backed by the file.
+
+    Raises:
+        - InvalidInputError: If the file is not a supported prime table.
+
+    Example:
+        >>> open_prime_table("primes.bin").is_prime(999983)  # doctest: +SKIP
+        True
+    """
+    return PrimeSieve.open(path)
+
+
+# Shared small-prime data for _quick_checks: a bitmap for n < 2**20, built on
+# first use, and the product of every prime below 2048 for larger n.
+_SMALL_PRIME_LIMIT = 1 << 20
+_QUICK_PRIMORIAL = math.prod(_small_primes(2047))
+_small_prime_bits = None
+
+
+def _small_prime_table() -> bytearray:
+    """Return the wheel-30 bitmap of primes below 2**20, building it once."""
+    global _small_prime_bits
+    if _small_prime_bits is None:
+        _small_prime_bits = PrimeSieve(_SMALL_PRIME_LIMIT)._bits
+    return _small_prime_bits
+
+
+def _nth_prime_upper_bound(k: int) -> int:
+    """Rosser-Schoenfeld style upper bound for the k-th prime."""
+    if k < 6:
+        return 13
+    log_k = math.log(k)
+    return int(k * (log_k + math.log(log_k))) + 1
+
+
+def _iroot(x: int, k: int) -> int:
+    """Integer k-th root: the largest r with r**k <= x."""
+    if x.bit_length() > 52:
+        # Beyond exact float range: Newton's method from an upper bound.
+        r = 1 << -(-x.bit_length() // k)
+        while True:
+            s = ((k - 1) * r + x // r ** (k - 1)) // k
+            if s >= r:
+                return r
+            r = s
+    r = int(round(x ** (1.0 / k)))
+    while r**k > x:
+        r -= 1
+    while (r + 1) ** k <= x:
+        r += 1
+    return r
+
+
+def _lucy_pi(x: int, r: int) -> int:
+    """
+    pi(x) by Lucy_Hedgehog's method, with r = isqrt(x).
+
+    small[v] and large[i] start as the count of 2 .. v and 2 .. x // i; for
+    each prime p every entry >= p * p loses the numbers whose smallest prime
+    factor is p, leaving prime counts.
+    """
+    small = array("q", range(-1, r))  # small[v] counts 2 .. v
+    small[0] = 0
+    large = array("q", [0]) + array("q", (x // i - 1 for i in range(1, r + 1)))
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue
+        sp, p2 = small[p - 1], p * p
+        top = min(r, x // p2)
+        mid = min(top, r // p)
+        # Each right-hand side is built from the old values before assigning.
+        pairs = zip(large[1 : mid + 1], large[p : mid * p + 1 : p])
+        large[1 : mid + 1] = array("q", [a - b + sp for a, b in pairs])
+        if top > mid:
+            rest = range(mid + 1, top + 1)
+            large[mid + 1 : top + 1] = array(
+                "q", [large[i] - small[x // (i * p)] + sp for i in rest]
+            )
+        if p2 <= r:
+            small[p2:] = array(
+                "q", [small[v] - small[v // p] + sp for v in range(p2, r + 1)]
+            )
+    return large[1]
+
+
+def _lucy_pi_numpy(x: int, r: int) -> int:
+    """NumPy backend of _lucy_pi (x < 2**62)."""
+    small = np.arange(-1, r, dtype=np.int64)
+    small[0] = 0
+    large = np.zeros(r + 1, dtype=np.int64)
+    large[1:] = x // np.arange(1, r + 1, dtype=np.int64) - 1
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue
+        sp, p2 = small[p - 1], p * p
+        top = min(r, x // p2)
+        mid = min(top, r // p)
+        large[1 : mid + 1] -= large[p : mid * p + 1 : p] - sp
+        if top > mid:
+            i = np.arange(mid + 1, top + 1, dtype=np.int64)
+            large[mid + 1 : top + 1] -= small[x // (i * p)] - sp
+        if p2 <= r:
+            small[p2:] -= small[np.arange(p2, r + 1) // p] - sp
+    return int(large[1])
+
+
+def prime_count(x: int) -> int:
+    """
+    Count the primes <= x (pi(x)) without listing them.
+
+    Parameters:
+        - x (int): The upper bound.
+
+    Returns:
+        - int: The number of primes <= x.
+
+    Raises:
+        - InvalidInputError: If x is not an integer.
+
+    Notes:
+        - Uses Lucy_Hedgehog's method: two arrays of sqrt(x) counts, for
+          every v <= sqrt(x) and every x // i, are sieved prime by prime
+          in O(x^(3/4)) steps. Memory is O(sqrt(x)), about 16 MB at 10**12.
+        - Vectorized with NumPy when it is installed (pi(10**12) in a few
+          seconds); the pure Python path is several times slower.
+
+    Example:
+        >>> prime_count(10**9)
+        50847534
+    """
+    if not isinstance(x, int):
+        raise InvalidInputError("Number must be an integer")
+    if x < 2:
+        return 0
+    r = math.isqrt(x)
+    if NUMPY_AVAILABLE and x < 1 << 62:
+        return _lucy_pi_numpy(x, r)
+    return _lucy_pi(x, r)
+
+
+def nth_prime(k: int) -> int:
+    """
+    Return the k-th prime (1-based).
+
+    Parameters:
+        - k (int): The index of the prime.
+
+    Returns:
+        - int: The k-th prime.
+
+    Raises:
+        - InvalidInputError: If k is not a positive integer.
+
+    Notes:
+        - Small k is answered from a PrimeSieve. Larger k brackets the answer
+          with an analytic estimate, corrects it with `prime_count` and
+          finishes with a short segmented sieve around the estimate.
+
+    Example:
+        >>> nth_prime(10**6)
+        15485863
+    """
+    if not isinstance(k, int):
+        raise InvalidInputError("Index must be an integer")
+    if k < 1:
+        raise InvalidInputError("Index must be >= 1")
+    if k < 10**5:
+        return PrimeSieve(_nth_prime_upper_bound(k)).nth_prime(k)
+    log_k = math.log(k)
+    log_log_k = math.log(log_k)
+    x = int(k * (log_k + log_log_k - 1 + (log_log_k - 2) / log_k))
+    count = prime_count(x)
+    if count < k:
+        # The answer lies above x: walk forward through the missing primes.
+        for index, p in enumerate(_iter_primes(x + 1, _nth_prime_upper_bound(k))):
+            if index == k - count - 1:
+                return p
+    # The answer is at or below x: sieve windows below x until it is covered.
+    back = count - k + 1
+    width = int(2 * back * math.log(x)) + 1000
+    while True:
+        window = list(_iter_primes(max(x - width, 2), x))
+        if len(window) >= back:
+            return window[-back]
+        width *= 2
+
+
+# Batch primality: values up to this bound are answered from a wheel table,
+# larger ones are trial divided (one gcd, or NumPy modulo passes) first.
+_BATCH_TABLE_LIMIT = 1 << 24
+_BATCH_TRIAL_PRIMES = tuple(_small_primes(1023)[3:])
+# The table, shared across calls and grown on demand, and a NumPy copy of
+# its bits (a view would stop the bytearray from growing).
+_batch_sieve = None
+_batch_bits_numpy = None
+
+
+def _batch_table(bound: int) -> PrimeSieve:
+    """Return the shared is_prime_many table, grown to cover bound."""
+    global _batch_sieve
+    if _batch_sieve is None:
+        _batch_sieve = PrimeSieve(bound)
+    else:
+        _batch_sieve._covers(bound)
+    return _batch_sieve
+
+
+def is_prime_many(values):
+    """
+    Test many integers for primality at once.
+
+    Parameters:
+        - values (list | tuple | array.array | numpy.ndarray): Integers to test.
+
+    Returns:
+        - bytearray | numpy.ndarray: One flag per input (1/True if prime), a
+          NumPy boolean array when values is a NumPy array.
+
+    Raises:
+        - InvalidInputError: If values is not a sequence of integers.
+
+    Notes:
+        - Values up to 2**24 are looked up in a PrimeSieve table kept between
+          calls; it grows to the largest such value seen so far.
+        - Larger values share one trial-division pass by small primes, and
+          only the survivors run Miller - Rabin.
+        - With NumPy installed, lists, tuples and arrays are converted with
+          numpy.asarray and take the vectorized path; inputs that do not fit
+          a 64-bit integer dtype stay on the pure Python path.
+
+    Example:
+        >>> list(is_prime_many([1, 2, 9, 97, 2**61 - 1]))
+        [0, 1, 0, 1, 1]
+    """
+    if NUMPY_AVAILABLE and isinstance(values, np.ndarray):
+        return _is_prime_many_numpy(values)
+    if isinstance(values, array):
+        if values.typecode not in "bBhHiIlLqQ":
+            raise InvalidInputError("Array must have an integer typecode")
+    elif not isinstance(values, (list, tuple)):
+        raise InvalidInputError("Input must be a list, tuple or array")
+    elif not all(isinstance(v, int) for v in values):
+        raise InvalidInputError("All elements must be integers")
+    result = bytearray(len(values))
+    if not values:
+        return result
+    if NUMPY_AVAILABLE:
+        packed = np.asarray(values)
+        if packed.dtype.kind in "iu":
+            return bytearray(_is_prime_many_numpy(packed).tobytes())
+    top = max((n for n in values if n <= _BATCH_TABLE_LIMIT), default=0)
+    if top >= 7:
+        sieve = _batch_table(top)
+        bits, bound = sieve._bits, sieve.limit
+    else:
+        bits, bound = None, 6
+    for i, n in enumerate(values):
+        if n <= bound:
+            if n >= 7:
+                result[i] = bits[n // 30] & _WHEEL_MASK[n % 30] != 0
+            else:
+                result[i] = n in (2, 3, 5)
+        elif math.gcd(n, _QUICK_PRIMORIAL) == 1:
+            result[i] = _is_probable_prime(n)
+    return result
+
+
+def _is_prime_many_numpy(values):
+    """NumPy backend of is_prime_many."""
+    global _batch_bits_numpy
+    shape = values.shape
+    if values.dtype.kind not in "iu":
+        if values.dtype.kind == "O":
+            flags = is_prime_many(values.ravel().tolist())
+            return np.frombuffer(flags, dtype=bool).reshape(shape)
+        raise InvalidInputError("Array must have an integer dtype")
+    values = values.ravel()
+    if values.dtype.itemsize < 8:
+        # Narrow dtypes cannot hold the table limit (rounded up past the max).
+        values = values.astype(np.int64)
+    result = np.zeros(values.shape, dtype=bool)
+    if not values.size:
+        return result.reshape(shape)
+    # Keep scalars in the array's own dtype so uint64 never decays to float64.
+    typed = values.dtype.type
+    in_table = values <= typed(_BATCH_TABLE_LIMIT)
+    top = int(values[in_table].max()) if in_table.any() else 0
+    bound = 6
+    if top >= 7:
+        sieve = _batch_table(top)
+        bits, bound = _batch_bits_numpy, sieve.limit
+        if bits is None or bits.size != len(sieve._bits):
+            bits = np.frombuffer(bytes(sieve._bits), dtype=np.uint8)
+            _batch_bits_numpy = bits
+        masks = np.frombuffer(_WHEEL_MASK, dtype=np.uint8)
+        small = (values >= typed(7)) & (values <= typed(bound))
+        n = values[small]
+        result[small] = (bits[n // typed(30)] & masks[n % typed(30)]) != 0
+    result[(values == typed(2)) | (values == typed(3)) | (values == typed(5))] = True
+
+    large = np.flatnonzero(values > typed(bound))
+    n = values[large]
+    keep = (n % typed(2) != 0) & (n % typed(3) != 0) & (n % typed(5) != 0)
+    for p in _BATCH_TRIAL_PRIMES:
+        keep &= n % typed(p) != 0
+    for i in large[keep]:
+        result[i] = _is_probable_prime(int(values[i]))
+    return result.reshape(shape)
 
 
 def is_emirp(input_number: int) -> bool:
@@ -213,6 +1266,13 @@ def generate_emirp_list(limit: int) -> list:
     Raises:
         - InvalidInputError: If limit is not an integer >= 2.
 
+    Notes:
+        - Builds one PrimeSieve up to the largest digit reversal of any
+          number <= limit and answers every reversal by table lookup.
+        - Only primes whose leading digit is 1, 3, 7 or 9 are reversed; the
+          others reverse to a multiple of 2 or 5. Reversal is vectorized
+          when NumPy is installed.
+
     Example:
         >>> generate_emirp_list(20)
         [13, 17]
@@ -221,4 +1281,43 @@ def generate_emirp_list(limit: int) -> list:
         raise InvalidInputError("Limit must be an integer")
     if limit < 2:
         raise InvalidInputError("Limit must be >= 2")
-    return [i for i in range(2, limit + 1) if is_emirp(i)]
+    # limit itself can only have more digits than limit - 1 when it is a
+    # power of ten, which is not prime.
+    digits = len(str(limit - 1))
+    sieve = PrimeSieve(max(limit, 10**digits - 1))
+    bits = sieve._bits
+    result = []
+    for width in range(2, digits + 1):
+        scale = 10 ** (width - 1)
+        for lead in (1, 3, 7, 9):
+            lo, hi = lead * scale, min((lead + 1) * scale - 1, limit)
+            if lo > hi:
+                break
+            if NUMPY_AVAILABLE:
+                result += _emirps_numpy(bits, lo, hi, width)
+                continue
+            for p in sieve._iter_table(lo, hi):
+                r = int(str(p)[::-1])
+                if r != p and bits[r // 30] & _WHEEL_MASK[r % 30]:
+                    result.append(p)
+    return result
+
+
+def _emirps_numpy(bits: bytearray, lo: int, hi: int, width: int) -> list:
+    """Vectorized emirp scan of the width-digit primes in [lo, hi]."""
+    table = np.frombuffer(bits, dtype=np.uint8)
+    first = lo // 30
+    planes = np.unpackbits(
+        table[first : hi // 30 + 1, None], axis=1, bitorder="little"
+    )
+    index, bit = np.nonzero(planes)
+    values = (index.astype(np.int64) + first) * 30 + np.array(_WHEEL)[bit]
+    values = values[(values >= lo) & (values <= hi)]
+    reversed_values = np.zeros_like(values)
+    rest = values.copy()
+    for _ in range(width):
+        reversed_values = reversed_values * 10 + rest % 10
+        rest //= 10
+    masks = np.frombuffer(_WHEEL_MASK, dtype=np.uint8)
+    hits = (table[reversed_values // 30] & masks[reversed_values % 30]) != 0
+    return values[hits & (reversed_values != values)].tolist()
@@ -7,6 +7,7 @@ Functions for perfect, narcissistic, amicable, and happy numbers.
 from pchjlib.utils import InvalidInputError
 
 from pchjlib.divisors_multiples import (
+    build_sigma_table,
     sum_of_divisors,
 )  # Assuming sum_of_divisors is in divisors_multiples.py; adjust if needed
 
@@ -70,6 +71,10 @@ def generate_perfect_number_list(limit: int) -> list:
     Raises:
         - InvalidInputError: If limit is not a positive integer.
 
+    Notes:
+        - Reads sigma(i) from one `build_sigma_table(limit)` sieve instead
+          of calling `sum_of_divisors` for every i.
+
     Example:
         >>> generate_perfect_number_list(10)
         [6]
@@ -78,7 +83,8 @@ def generate_perfect_number_list(limit: int) -> list:
         raise InvalidInputError("Limit must be an integer")
     if limit < 1:
         raise InvalidInputError("Limit must be positive")
-    return [i for i in range(1, limit + 1) if is_perfect_number(i)]
+    sigma = build_sigma_table(limit)
+    return [i for i in range(1, limit + 1) if sigma[i] == 2 * i]
 
 
 def is_narcissistic_number(input_number: int) -> bool:
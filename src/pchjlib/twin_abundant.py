@@ -4,8 +4,8 @@
 Functions for twin primes and abundant numbers.
 """
 
-from pchjlib.primes import is_prime
-from pchjlib.divisors_multiples import sum_of_divisors
+from pchjlib.primes import PrimeSieve, is_prime
+from pchjlib.divisors_multiples import build_sigma_table, sum_of_divisors
 from pchjlib.utils import InvalidInputError
 
 
@@ -54,7 +54,8 @@ def generate_twin_prime_list(limit: int) -> list:
         raise InvalidInputError("Limit must be an integer")
     if limit < 2:
         raise InvalidInputError("Limit must be >= 2")
-    return [i for i in range(2, limit + 1) if is_twin_prime(i)]
+    sieve = PrimeSieve(limit + 2)
+    return [p for p in sieve.primes(2, limit) if p - 2 in sieve or p + 2 in sieve]
 
 
 def is_abundant_number(input_number: int) -> bool:
@@ -94,6 +95,10 @@ def generate_abundant_number_list(limit: int) -> list:
     Raises:
         - InvalidInputError: If limit is not a positive integer.
 
+    Notes:
+        - Reads sigma(i) from one `build_sigma_table(limit)` sieve instead
+          of calling `sum_of_divisors` for every i.
+
     Example:
         >>> generate_abundant_number_list(20)
         [12, 18, 20]
@@ -102,4 +107,5 @@ def generate_abundant_number_list(limit: int) -> list:
         raise InvalidInputError("Limit must be an integer")
     if limit < 1:
         raise InvalidInputError("Limit must be positive")
-    return [i for i in range(1, limit + 1) if is_abundant_number(i)]
+    sigma = build_sigma_table(limit)
+    return [i for i in range(1, limit + 1) if sigma[i] > 2 * i]
@@ -6,9 +6,32 @@ import os
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 )
+import math
+import multiprocessing
+import tempfile
+import time
 import unittest
-
-from pchjlib.primes import is_prime, generate_prime_list, is_emirp, generate_emirp_list
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pchjlib.primes import (
+    is_prime,
+    generate_prime_list,
+    iter_primes,
+    primes_in_range,
+    PrimeSieve,
+    build_prime_table,
+    open_prime_table,
+    prime_count,
+    nth_prime,
+    is_prime_many,
+    is_emirp,
+    generate_emirp_list,
+)
 from pchjlib.twin_abundant import (
     is_twin_prime,
     generate_twin_prime_list,
@@ -32,13 +55,37 @@ from pchjlib.special_numbers2 import (
     are_friendly_numbers,
 )
 from pchjlib.divisors_multiples import (
+    sum_of_divisors,
+    build_sigma_table,
+    PrimePowerRule,
+    tau_rule,
+    sigma_k_rule,
+    phi_rule,
+    mu_rule,
+    omega_rule,
+    multiplicative_sieve,
+    iter_multiplicative_sieve,
     generate_divisor_list,
+    iter_divisors,
     generate_multiple_list,
     common_divisors,
     greatest_common_divisor,
     least_common_multiple,
 )
-from pchjlib.prime_factorization import prime_factors, greatest_common_prime_divisor
+from pchjlib.prime_factorization import (
+    CancellationToken,
+    PartialFactorization,
+    build_spf_table,
+    prime_factors,
+    prime_factors_many,
+    siqs_factor,
+    factorization,
+    factorization_cache_info,
+    set_factorization_cache_size,
+    clear_factorization_cache,
+    greatest_common_prime_divisor,
+    greatest_common_prime_divisor_many,
+)
 from pchjlib.string_processing import (
     remove_duplicates,
     extract_digits_from_string,
@@ -60,17 +107,159 @@ from pchjlib.sequence_generation import (
     generate_sequence_rule_3,
 )
 from pchjlib.inversion_counting import count_inversions
+from pchjlib import prime_factorization as factorization_module
+from pchjlib import primes as primes_module
+from pchjlib.utils import InvalidInputError, MathError, OutOfRangeError
 
 
 class TestPchjlib(unittest.TestCase):
 
+    def setUp(self):
+        # Every test starts like a fresh process: no SPF table, empty cache,
+        # no is_prime_many table.
+        module = factorization_module
+        self._saved_spf_table = module._spf_table
+        self._saved_cache = module._factor_cache.copy()
+        self._saved_cache_stats = dict(module._factor_cache_stats)
+        self._saved_batch = (
+            primes_module._batch_sieve,
+            primes_module._batch_bits_numpy,
+        )
+        module._spf_table = array("I")
+        clear_factorization_cache()
+        primes_module._batch_sieve = primes_module._batch_bits_numpy = None
+
+    def tearDown(self):
+        module = factorization_module
+        module._spf_table = self._saved_spf_table
+        module._factor_cache.clear()
+        module._factor_cache.update(self._saved_cache)
+        module._factor_cache_stats.update(self._saved_cache_stats)
+        primes_module._batch_sieve, primes_module._batch_bits_numpy = self._saved_batch
+
     def test_is_prime(self):
         self.assertTrue(is_prime(7))
         self.assertFalse(is_prime(4))
         self.assertFalse(is_prime(1))
+        self.assertTrue(is_prime(1048573))  # last prime below the bitmap bound
+        self.assertTrue(is_prime(1048583))
+        self.assertFalse(is_prime(2039 * 2053))
+        self.assertFalse(is_prime(3825123056546413051))  # spsp to bases 2..23
+        self.assertTrue(is_prime(2**89 - 1))
+        self.assertTrue(is_prime(2**521 - 1))
+        self.assertFalse(is_prime((2**61 - 1) * (2**89 - 1)))
+
+    def test_is_prime_many(self):
+        values = [-3, 0, 1, 2, 9, 97, 2**31 - 1, 2**61 - 1, (2**31 - 1) ** 2]
+        self.assertEqual(
+            list(is_prime_many(values)), [int(is_prime(n)) for n in values]
+        )
+        self.assertEqual(list(is_prime_many(array("I", [5, 6, 7]))), [1, 0, 1])
+        self.assertEqual(is_prime_many([]), bytearray())
+
+    def test_is_prime_many_shared_table(self):
+        # The table is sized by the values it can answer and kept for reuse.
+        self.assertEqual(list(is_prime_many([97, 2**61 - 1, 10**30 + 57])), [1, 1, 1])
+        sieve = primes_module._batch_sieve
+        self.assertLess(sieve.limit, 1000)
+        self.assertEqual(list(is_prime_many((89, 2**64 + 13))), [1, 1])
+        self.assertIs(primes_module._batch_sieve, sieve)
+        self.assertEqual(list(is_prime_many([1, 2**89 - 1])), [0, 1])
+        self.assertIs(primes_module._batch_sieve, sieve)
+        # No 64-bit NumPy dtype holds both ends: the pure Python path.
+        mixed = [-7, 2**63 + 29, 7919]
+        self.assertEqual(list(is_prime_many(mixed)), [int(is_prime(n)) for n in mixed])
+
+    @unittest.skipUnless(np, "numpy not installed")
+    def test_is_prime_many_numpy_dtypes(self):
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint64):
+            info = np.iinfo(dtype)
+            values = np.arange(max(info.min, -5), min(info.max, 300) + 1, dtype=dtype)
+            values = np.append(values, info.max)
+            expected = [is_prime(int(n)) for n in values]
+            self.assertEqual(is_prime_many(values).tolist(), expected)
+        grid = np.array([[2, 4], [97, 100]], dtype=np.int16)
+        self.assertEqual(is_prime_many(grid).tolist(), [[True, False], [True, False]])
 
     def test_generate_prime_list(self):
         self.assertEqual(generate_prime_list(10), [2, 3, 5, 7])
+        self.assertEqual(len(generate_prime_list(10**6)), 78498)
+        self.assertEqual(generate_prime_list(10, workers=2), [2, 3, 5, 7])
+
+    def test_generate_prime_list_parallel(self):
+        primes = generate_prime_list(10**7, workers=2)
+        self.assertEqual(len(primes), 664579)
+        self.assertEqual(primes[-1], 9999991)
+        self.assertEqual(PrimeSieve(10**7, workers=2).count_primes(10**7), 664579)
+
+    def test_iter_primes(self):
+        self.assertEqual(list(iter_primes(10, 30)), [11, 13, 17, 19, 23, 29])
+        self.assertEqual(list(iter_primes(0, 2)), [2])
+        self.assertEqual(list(iter_primes(30, 10)), [])
+        self.assertEqual(
+            list(iter_primes(10**9, 10**9 + 10)), [1000000007, 1000000009]
+        )
+
+    def test_primes_in_range(self):
+        self.assertEqual(
+            list(primes_in_range(10**12, 10**12 + 100)),
+            [1000000000039, 1000000000061, 1000000000063, 1000000000091],
+        )
+        window = primes_in_range(10**15, 10**15 + 10**5)
+        self.assertEqual(window.typecode, "Q")
+        self.assertEqual(len(window), 2805)
+        self.assertEqual(list(primes_in_range(0, 10)), [2, 3, 5, 7])
+
+    def test_prime_sieve(self):
+        sieve = PrimeSieve(100)
+        self.assertTrue(sieve.is_prime(97))
+        self.assertFalse(sieve.is_prime(91))
+        self.assertEqual(sieve.count_primes(10**6), 78498)
+        self.assertEqual(sieve.nth_prime(1000), 7919)
+        self.assertEqual(sieve.next_prime(7919), 7927)
+        self.assertEqual(sieve.prev_prime(7919), 7907)
+        self.assertEqual(list(sieve.primes(0, 12)), [2, 3, 5, 7, 11])
+
+    def test_prime_sieve_next_prime_past_table(self):
+        # The answer lies in the byte just past the table.
+        self.assertEqual(PrimeSieve(100).next_prime(125), 127)
+        self.assertEqual(PrimeSieve(31).next_prime(59), 61)
+        for limit in (30, 59, 89, 100):
+            for n in range(limit - 5, limit + 65):
+                expected = next(iter(iter_primes(n + 1, 2 * n + 10)))
+                self.assertEqual(PrimeSieve(limit).next_prime(n), expected)
+
+    def test_prime_sieve_past_growth_limit(self):
+        # Huge queries are answered without sieving up to them.
+        sieve = PrimeSieve(100)
+        self.assertTrue(sieve.is_prime(10**20 + 39))
+        self.assertFalse(sieve.is_prime(10**20 + 1))
+        self.assertEqual(sieve.next_prime(10**20), 10**20 + 39)
+        self.assertEqual(sieve.prev_prime(10**20), 10**20 - 11)
+        self.assertEqual(list(sieve.primes(10**20, 10**20 + 50)), [10**20 + 39])
+        self.assertEqual(sieve.limit, 119)
+
+    def test_prime_table_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.bin")
+            build_prime_table(path, 10**6)
+            with open_prime_table(path) as sieve:
+                self.assertTrue(sieve.is_prime(999983))
+                self.assertEqual(sieve.count_primes(10**6), 78498)
+                self.assertEqual(sieve.nth_prime(78498), 999983)
+                self.assertEqual(list(sieve.primes(0, 12)), [2, 3, 5, 7, 11])
+                with self.assertRaises(OutOfRangeError):
+                    sieve.is_prime(10**7)
+
+    def test_prime_count(self):
+        self.assertEqual(prime_count(1), 0)
+        self.assertEqual(prime_count(100), 25)
+        self.assertEqual(prime_count(10**10), 455052511)
+
+    def test_nth_prime(self):
+        self.assertEqual(nth_prime(1), 2)
+        self.assertEqual(nth_prime(1000), 7919)
+        self.assertEqual(nth_prime(10**6), 15485863)
 
     def test_is_emirp(self):
         self.assertTrue(is_emirp(13))
@@ -78,6 +267,9 @@ class TestPchjlib(unittest.TestCase):
 
     def test_generate_emirp_list(self):
         self.assertEqual(generate_emirp_list(20), [13, 17])
+        self.assertEqual(
+            generate_emirp_list(10001), [n for n in range(2, 10002) if is_emirp(n)]
+        )
 
     def test_is_twin_prime(self):
         self.assertTrue(is_twin_prime(5))
@@ -142,14 +334,78 @@ class TestPchjlib(unittest.TestCase):
         self.assertTrue(are_friendly_numbers(30, 140))
         self.assertFalse(are_friendly_numbers(220, 284))
 
+    def test_sum_of_divisors(self):
+        values = (1, 6, 12, 28, 97)
+        self.assertEqual([sum_of_divisors(n) for n in values], [0, 6, 16, 28, 1])
+        # Far past any O(n) scan.
+        self.assertEqual(sum_of_divisors(2**30 * (2**31 - 1)), 2**30 * (2**31 - 1))
+        self.assertEqual(sum_of_divisors(10**12), 1499694822171)
+
+    def test_build_sigma_table(self):
+        self.assertEqual(list(build_sigma_table(6)), [0, 1, 3, 4, 7, 6, 12])
+        table = build_sigma_table(1000)
+        self.assertTrue(all(table[i] - i == sum_of_divisors(i) for i in range(1, 1001)))
+        self.assertEqual(generate_perfect_number_list(10000), [6, 28, 496, 8128])
+        with self.assertRaises(InvalidInputError):
+            build_sigma_table(0)
+
+    def test_multiplicative_sieve(self):
+        tau = list(multiplicative_sieve(10, tau_rule))
+        self.assertEqual(tau, [0, 1, 2, 2, 3, 2, 4, 2, 4, 3, 4])
+        mu = list(multiplicative_sieve(10, mu_rule))
+        self.assertEqual(mu, [0, 1, -1, -1, 0, -1, 1, -1, 0, 0, 1])
+        omega = list(multiplicative_sieve(10, omega_rule))
+        self.assertEqual(omega[6:11], [2, 1, 1, 1, 2])
+        table = multiplicative_sieve(1000, phi_rule)
+        for n in (1, 2, 36, 97, 360, 1000):
+            coprime = sum(math.gcd(n, i) == 1 for i in range(1, n + 1))
+            self.assertEqual(table[n], coprime)
+        sigma = multiplicative_sieve(1000, sigma_k_rule(1))
+        self.assertEqual(list(sigma), list(build_sigma_table(1000)))
+        self.assertEqual(multiplicative_sieve(12, sigma_k_rule(2))[12], 210)
+        segments = iter_multiplicative_sieve(1000, phi_rule, segment_size=97)
+        self.assertEqual([x for _, values in segments for x in values], list(table)[1:])
+        for typecode in ("u", "", "qQ"):
+            with self.assertRaises(InvalidInputError):
+                multiplicative_sieve(10, phi_rule, typecode=typecode)
+        with self.assertRaises(InvalidInputError):
+            multiplicative_sieve(10, 3)
+
+    def test_multiplicative_sieve_plain_rule(self):
+        # Plain functions are only ever called with int primes.
+        values = multiplicative_sieve(30, lambda p, k: 1 if p == 2 else p**k)
+        self.assertEqual(list(values), [0] + [n // (n & -n) for n in range(1, 31)])
+        big_omega = PrimePowerRule(lambda p, k: k, additive=True)
+        values = multiplicative_sieve(12, big_omega)
+        self.assertEqual(list(values)[8:13], [3, 2, 2, 1, 3])
+        values = multiplicative_sieve(6, phi_rule, additive=True)
+        self.assertEqual(list(values), [0, 0, 1, 2, 2, 4, 3])
+
     def test_generate_divisor_list(self):
         self.assertEqual(generate_divisor_list(6), [1, 2, 3, 6])
+        self.assertEqual(generate_divisor_list(-6, False), [-6, -3, -2, -1, 1, 2, 3, 6])
+        self.assertEqual(len(generate_divisor_list(963761198400)), 6720)
+
+    def test_iter_divisors(self):
+        self.assertEqual(list(iter_divisors(12)), [1, 2, 3, 4, 6, 12])
+        unsorted = iter_divisors(-360, sorted=False)
+        self.assertEqual(sorted(unsorted), generate_divisor_list(360))
+        n = 2**5 * 3**3 * 5**2 * 7**2 * 11 * 13 * 17 * 19 * 23 * 29 * 31 * 37
+        divisors = iter_divisors(n)
+        self.assertEqual([next(divisors) for _ in range(6)], [1, 2, 3, 4, 5, 6])
+        with self.assertRaises(InvalidInputError):
+            iter_divisors(0)
 
     def test_generate_multiple_list(self):
         self.assertEqual(generate_multiple_list(3, 5), [3, 6, 9, 12, 15])
 
     def test_common_divisors(self):
         self.assertEqual(common_divisors([12, 18]), [1, 2, 3, 6])
+        big = [(2**61 - 1) * 6 * k for k in (10**6 + 3, 10**6 + 33, 10**6 + 37)]
+        expected = [1, 2, 3, 6] + [d * (2**61 - 1) for d in (1, 2, 3, 6)]
+        self.assertEqual(common_divisors(big + [0]), expected)
+        with self.assertRaises(MathError):
+            common_divisors([12, 0])
 
     def test_greatest_common_divisor(self):
         self.assertEqual(greatest_common_divisor([12, 18]), 6)
@@ -159,9 +415,162 @@ class TestPchjlib(unittest.TestCase):
 
     def test_prime_factors(self):
         self.assertEqual(prime_factors(12), [2, 2, 3])
+        self.assertEqual(prime_factors(2**64 + 1), [274177, 67280421310721])
+        self.assertEqual(
+            prime_factors(3 * 1000000007**2 * 1000000009),
+            [3, 1000000007, 1000000007, 1000000009],
+        )
+
+    def test_prime_factors_ecm(self):
+        # Both factors are past the Pollard rho budget.
+        n = 10000000000037 * 10000000000000000051
+        self.assertEqual(prime_factors(n), [10000000000037, 10000000000000000051])
+        self.assertEqual(prime_factors(n, workers=2), prime_factors(n))
+        self.assertEqual(
+            prime_factors((2**61 - 1) ** 3 * (2**31 - 1)),
+            [2**31 - 1] + [2**61 - 1] * 3,
+        )
+        with self.assertRaises(InvalidInputError):
+            prime_factors(n, workers=0)
+
+    def test_prime_factors_timeout(self):
+        n = 2**256 + 1
+        partial = prime_factors(n, timeout=0.2)
+        self.assertIsInstance(partial, PartialFactorization)
+        self.assertEqual(math.prod(partial.factors) * partial.cofactor, n)
+        self.assertIn(partial.stage, ("trial division", "p-1", "p+1", "rho"))
+        token = CancellationToken()
+        token.cancel()
+        self.assertEqual(
+            prime_factors(n, token=token),
+            PartialFactorization([], n, "trial division"),
+        )
+        self.assertEqual(prime_factors(2**64 + 1, timeout=60), [274177, 67280421310721])
+        with self.assertRaises(InvalidInputError):
+            prime_factors(n, timeout=0)
+        with self.assertRaises(InvalidInputError):
+            prime_factors(n, token=True)
+
+    def test_prime_factors_pool_workers_stop(self):
+        # Interrupted ECM and SIQS pools must not leave workers running.
+        n = (10**29 + 319) * (10**30 + 57)
+        for run in (factorization_module._ecm, factorization_module._siqs):
+            with self.assertRaises(factorization_module._Interrupted):
+                run(n, workers=2, deadline=factorization_module._Deadline(0.5))
+            for _ in range(100):
+                if not multiprocessing.active_children():
+                    break
+                time.sleep(0.05)
+            self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_prime_factors_smooth_p_minus_plus_one(self):
+        q = 10**38 + 133
+        # p - 1 = 2 * 999983 * (primes < 20000); p + 1 = 12 * 999979 * (...)
+        for p in (
+            49465984978156534434334167727494728267,
+            13697882669448969128796289296062265251,
+        ):
+            self.assertEqual(prime_factors(p * q), sorted([p, q]))
+
+    def test_siqs_factor(self):
+        p, q = 10**19 + 51, 10**19 + 87
+        self.assertIn(siqs_factor(p * q), (p, q))
+        self.assertIn(siqs_factor(p * q, factor_base_size=400, workers=2), (p, q))
+        self.assertEqual(siqs_factor(1000003**3), 1000003)
+        with self.assertRaises(MathError):
+            siqs_factor(p)
+        with self.assertRaises(InvalidInputError):
+            siqs_factor(p * q, factor_base_size=0)
+
+    def test_factorization_cache(self):
+        clear_factorization_cache()
+        n = 10000000000037 * 10000000000000000051
+        self.assertEqual(
+            factorization(n), ((10000000000037, 1), (10000000000000000051, 1))
+        )
+        self.assertEqual(prime_factors(n), [10000000000037, 10000000000000000051])
+        info = factorization_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["entries"]), (1, 1, 1))
+        self.assertEqual(factorization(2**5 * 3**20), ((2, 5), (3, 20)))
+        set_factorization_cache_size(info["bytes"])
+        self.assertEqual(factorization_cache_info()["evictions"], 1)
+        self.assertLessEqual(factorization_cache_info()["bytes"], info["bytes"])
+        set_factorization_cache_size(1 << 24)
+        with self.assertRaises(InvalidInputError):
+            set_factorization_cache_size(-1)
+
+    def test_build_spf_table(self):
+        table = build_spf_table(1000)
+        self.assertEqual((table[2], table[91], table[997], table[1000]), (2, 7, 997, 2))
+        self.assertEqual(prime_factors(360), [2, 2, 2, 3, 3, 5])
+        self.assertEqual(prime_factors(10**6 + 3), [1000003])
+
+    def test_prime_factors_many(self):
+        self.assertEqual(prime_factors_many([12, 35, 97]), [[2, 2, 3], [5, 7], [97]])
+        values = [2**40 - 1, 10**6, 999983 * 1000003]
+        self.assertEqual(prime_factors_many(values), [prime_factors(n) for n in values])
+        # Past the table: small primes come out of the product/remainder tree.
+        values = [
+            2**64 + 1,
+            3**50 * 1048573,
+            2**5 * 1048583**2 * (2**61 - 1),
+            2**89 - 1,
+        ]
+        self.assertEqual(prime_factors_many(values), [prime_factors(n) for n in values])
+        with self.assertRaises(InvalidInputError):
+            prime_factors_many([12, 1])
+
+    def test_prime_factors_many_no_small_factors(self):
+        # No prime below 2**20 divides these, and there is no SPF table yet.
+        values = [(2**61 - 1) * (2**31 - 1), 2**61 - 1, 1000003 * 1000033]
+        expected = [[2**31 - 1, 2**61 - 1], [2**61 - 1], [1000003, 1000033]]
+        self.assertEqual(prime_factors_many(values), expected)
+
+    def test_prime_factors_many_table_growth(self):
+        module = factorization_module
+        build_spf_table(1000)
+        # Two values do not pay for a 9 * 10**6 entry table.
+        self.assertEqual(prime_factors_many([9000001, 12]), [[61, 147541], [2, 2, 3]])
+        self.assertEqual(len(module._spf_table), 1001)
+        values = list(range(2, 5000))
+        self.assertEqual(prime_factors_many(values), [prime_factors(n) for n in values])
+        self.assertGreaterEqual(len(module._spf_table), 2002)
+
+    def test_prime_factors_many_workers(self):
+        values = [12, 35, 97, 2**64 + 1, 999983 * 1000003, 10**6, 2**40 - 1]
+        expected = [prime_factors(n) for n in values]
+        clear_factorization_cache()
+        build_spf_table(100)
+        self.assertEqual(prime_factors_many(values, workers=2), expected)
+        # Results from the workers land in the parent's cache...
+        self.assertEqual(factorization_cache_info()["entries"], 4)
+        self.assertEqual(factorization_cache_info()["hits"], 0)
+        # ...and are answered from it next time.
+        self.assertEqual(prime_factors_many(values, workers=2), expected)
+        self.assertEqual(factorization_cache_info()["hits"], 4)
+        ordered = prime_factors_many(values, workers=2, chunksize=2, stream="ordered")
+        self.assertEqual(list(ordered), expected)
+        done = prime_factors_many(values, workers=2, chunksize=3, stream="completed")
+        self.assertEqual(sorted(done), list(enumerate(expected)))
+        self.assertEqual(list(prime_factors_many(values, stream="ordered")), expected)
+        with self.assertRaises(InvalidInputError):
+            prime_factors_many(values, chunksize=0)
+        with self.assertRaises(InvalidInputError):
+            prime_factors_many(values, stream="unordered")
 
     def test_greatest_common_prime_divisor(self):
         self.assertEqual(greatest_common_prime_divisor(12, 18), 3)
+        big = (2**61 - 1) * 1000003
+        self.assertEqual(greatest_common_prime_divisor(big * 97, big * 89), 2**61 - 1)
+        with self.assertRaises(MathError):
+            greatest_common_prime_divisor(2**127 - 1, 2**89 - 1)
+
+    def test_greatest_common_prime_divisor_many(self):
+        self.assertEqual(greatest_common_prime_divisor_many([84, 126, 210]), 7)
+        with self.assertRaises(MathError):
+            greatest_common_prime_divisor_many([6, 10, 15])
+        with self.assertRaises(InvalidInputError):
+            greatest_common_prime_divisor_many([12])
 
     def test_remove_duplicates(self):
         self.assertEqual(remove_duplicates([1, 2, 2, 3]), [3, 2, 1])